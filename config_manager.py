@@ -3,11 +3,14 @@ Configuration Manager for CFST Data Extractor
 Handles validation and management of config.json settings
 """
 
+import copy
 import json
 import os
 import shutil
 import platform
-from typing import Dict, Any
+import re
+import threading
+from typing import Dict, Any, Tuple
 
 
 class ConfigError(Exception):
@@ -15,6 +18,68 @@ class ConfigError(Exception):
     pass
 
 
+# Default config structure (built once at import; never mutate it in place)
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "api_settings": {
+        "api_key": "YOUR_KEY_HERE",
+        "base_url": "https://api.ohmygpt.com/v1",
+        "model_name": "vertex-gemini-3-flash-preview"
+    },
+    "processing_settings": {
+        "short_paper_threshold": 15,
+        "max_scan_limit": 10,
+        "image_dpi": 150
+    },
+    "paths": {
+        "windows_source_path": "/mnt/c/Users/username/Documents/PDF_Source",
+        "archive_destination": "/mnt/e/Documents/data_extracted",
+        "manual_review_path": "./Manual_Review"
+    },
+    "auto_cleanup": True,
+    "auto_increment": True,
+    "delete_existing_before_import": True,
+    "cleanup_after_archive": True
+}
+
+
+# Validated configurations keyed by absolute config path, stored together with
+# the (st_mtime_ns, st_size, st_ino) signature of the file they were parsed from.
+# load_and_validate_config() is called once per archived PDF, so repeated
+# lookups are served from here until config.json changes on disk.
+_config_cache: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+_config_cache_lock = threading.Lock()
+
+
+def clear_config_cache() -> None:
+    """Drop memoized configurations so the next load re-reads config.json."""
+    with _config_cache_lock:
+        _config_cache.clear()
+
+
+def write_text_atomic(path: str, content: str) -> None:
+    """
+    Write text to path atomically.
+
+    The content goes to a sibling temp file that is fsync'ed and then
+    swapped in with os.replace, so a crash mid-write never leaves a
+    truncated file behind. The temp name is unique per process and thread,
+    so concurrent writers of the same path never share a temp file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def validate_config(config: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate complete configuration with detailed error messages.
@@ -93,6 +158,25 @@ def validate_api_settings(api_settings: Dict[str, Any]) -> list:
     return errors
 
 
+# Scalar processing settings, checked in this order:
+# (key, default, (minimum, too-low message), (maximum, too-high message)).
+# Boolean settings only get a type check, so their bounds are None.
+_PROCESSING_SETTING_RULES = (
+    # 短文献阈值已更新为10页（根据需求）
+    ("short_paper_threshold", 10, (1, "值必须大于0，当前: {}"), (50, "值过大({})，建议≤50")),
+    ("max_scan_limit", 10, (1, "值必须大于0，当前: {}"), (100, "值过大({})，建议≤50")),
+    ("image_dpi", 150, (72, "DPI过低({})，可能影响识别质量"), (600, "DPI过高({})，可能影响性能")),
+    ("enable_smart_filtering", True, None, None),
+    ("absolute_max_pages", 30, (1, "值必须大于0，当前: {}"), (100, "值过大({})，建议≤50")),
+    # Number of PDFs processed in parallel
+    ("concurrent_files", 1, (1, "值必须大于0，当前: {}"), (16, "值过大({})，建议≤8以避免API限流")),
+    # Reuse API results for identical page images
+    ("enable_ai_cache", True, None, None),
+    # Skip PDFs whose text has no CFST keywords
+    ("enable_text_prefilter", True, None, None),
+)
+
+
 def validate_processing_settings(processing_settings: Dict[str, Any]) -> list:
     """
     Validate processing settings with type checks and reasonable defaults.
@@ -105,67 +189,23 @@ def validate_processing_settings(processing_settings: Dict[str, Any]) -> list:
     """
     errors = []
 
-    # Check short_paper_threshold - 已更新为10页（根据需求）
-    if "short_paper_threshold" in processing_settings:
-        threshold = processing_settings["short_paper_threshold"]
-        if not isinstance(threshold, int):
-            errors.append("processing_settings.short_paper_threshold: 必须是整数")
-        elif threshold <= 0:
-            errors.append(f"processing_settings.short_paper_threshold: 值必须大于0，当前: {threshold}")
-        elif threshold > 50:
-            errors.append(f"processing_settings.short_paper_threshold: 值过大({threshold})，建议≤50")
-    else:
-        # Default to 10 pages per requirements
-        processing_settings["short_paper_threshold"] = 10
-        print("  使用默认设置: short_paper_threshold = 10")
-
-    # Check max_scan_limit
-    if "max_scan_limit" in processing_settings:
-        limit = processing_settings["max_scan_limit"]
-        if not isinstance(limit, int):
-            errors.append("processing_settings.max_scan_limit: 必须是整数")
-        elif limit <= 0:
-            errors.append(f"processing_settings.max_scan_limit: 值必须大于0，当前: {limit}")
-        elif limit > 100:
-            errors.append(f"processing_settings.max_scan_limit: 值过大({limit})，建议≤50")
-    else:
-        processing_settings["max_scan_limit"] = 10
-        print("  使用默认设置: max_scan_limit = 10")
-
-    # Check image_dpi
-    if "image_dpi" in processing_settings:
-        dpi = processing_settings["image_dpi"]
-        if not isinstance(dpi, int):
-            errors.append("processing_settings.image_dpi: 必须是整数")
-        elif dpi < 72:
-            errors.append(f"processing_settings.image_dpi: DPI过低({dpi})，可能影响识别质量")
-        elif dpi > 600:
-            errors.append(f"processing_settings.image_dpi: DPI过高({dpi})，可能影响性能")
-    else:
-        processing_settings["image_dpi"] = 150
-        print("  使用默认设置: image_dpi = 150")
-
-    # Check enable_smart_filtering
-    if "enable_smart_filtering" in processing_settings:
-        enabled = processing_settings["enable_smart_filtering"]
-        if not isinstance(enabled, bool):
-            errors.append("processing_settings.enable_smart_filtering: 必须是布尔值")
-    else:
-        processing_settings["enable_smart_filtering"] = True
-        print("  使用默认设置: enable_smart_filtering = true")
-
-    # Check absolute_max_pages
-    if "absolute_max_pages" in processing_settings:
-        max_pages = processing_settings["absolute_max_pages"]
-        if not isinstance(max_pages, int):
-            errors.append("processing_settings.absolute_max_pages: 必须是整数")
-        elif max_pages <= 0:
-            errors.append(f"processing_settings.absolute_max_pages: 值必须大于0，当前: {max_pages}")
-        elif max_pages > 100:
-            errors.append(f"processing_settings.absolute_max_pages: 值过大({max_pages})，建议≤50")
-    else:
-        processing_settings["absolute_max_pages"] = 30
-        print("  使用默认设置: absolute_max_pages = 30")
+    for key, default, lower, upper in _PROCESSING_SETTING_RULES:
+        if key not in processing_settings:
+            processing_settings[key] = default
+            shown = str(default).lower() if isinstance(default, bool) else default
+            print(f"  使用默认设置: {key} = {shown}")
+            continue
+
+        value = processing_settings[key]
+        if isinstance(default, bool):
+            if not isinstance(value, bool):
+                errors.append(f"processing_settings.{key}: 必须是布尔值")
+        elif not isinstance(value, int):
+            errors.append(f"processing_settings.{key}: 必须是整数")
+        elif value < lower[0]:
+            errors.append(f"processing_settings.{key}: " + lower[1].format(value))
+        elif value > upper[0]:
+            errors.append(f"processing_settings.{key}: " + upper[1].format(value))
 
     # Validate page_filtering settings if smart filtering is enabled
     if processing_settings.get("enable_smart_filtering", True):
@@ -242,7 +282,6 @@ def validate_page_filtering_settings(processing_settings: Dict[str, Any]) -> lis
                         errors.append(f"processing_settings.page_filtering.patterns.{pattern_key}: 必须是数组")
                     else:
                         # Check each pattern is a valid regex
-                        import re
                         for idx, pattern in enumerate(pattern_list):
                             if not isinstance(pattern, str):
                                 errors.append(f"processing_settings.page_filtering.patterns.{pattern_key}[{idx}]: 必须是字符串")
@@ -411,32 +450,19 @@ def load_and_validate_config(config_path: str = None) -> Dict[str, Any]:
     if config_path is None:
         # Default to config.json in same directory
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+    config_path = os.path.abspath(config_path)
 
-    if not os.path.exists(config_path):
+    try:
+        st = os.stat(config_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found: {config_path}")
+    file_sig = (st.st_mtime_ns, st.st_size, st.st_ino)
 
-    # Default config structure
-    default_config = {
-        "api_settings": {
-            "api_key": "YOUR_KEY_HERE",
-            "base_url": "https://api.ohmygpt.com/v1",
-            "model_name": "vertex-gemini-3-flash-preview"
-        },
-        "processing_settings": {
-            "short_paper_threshold": 15,
-            "max_scan_limit": 10,
-            "image_dpi": 150
-        },
-        "paths": {
-            "windows_source_path": "/mnt/c/Users/username/Documents/PDF_Source",
-            "archive_destination": "/mnt/e/Documents/data_extracted",
-            "manual_review_path": "./Manual_Review"
-        },
-        "auto_cleanup": True,
-        "auto_increment": True,
-        "delete_existing_before_import": True,
-        "cleanup_after_archive": True
-    }
+    with _config_cache_lock:
+        cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == file_sig:
+        # Hand out a copy so callers cannot mutate the memoized config
+        return copy.deepcopy(cached[1])
 
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
@@ -445,8 +471,8 @@ def load_and_validate_config(config_path: str = None) -> Dict[str, Any]:
         # Check if using old flat structure (backward compatibility)
         if "api_settings" not in config:
             print("警告: config.json使用旧结构。正在迁移到新结构...")
-            # Migrate old structure to new
-            migrated_config = default_config.copy()
+            # Migrate old structure to new (deep copy: the defaults are shared)
+            migrated_config = copy.deepcopy(DEFAULT_CONFIG)
 
             # Copy old path settings
             if "windows_source_path" in config:
@@ -462,15 +488,14 @@ def load_and_validate_config(config_path: str = None) -> Dict[str, Any]:
                     migrated_config[key] = config[key]
 
             # Save migrated config
-            with open(config_path, 'w', encoding='utf-8') as fw:
-                json.dump(migrated_config, fw, indent=2, ensure_ascii=False)
+            write_text_atomic(config_path, json.dumps(migrated_config, indent=2, ensure_ascii=False))
 
             print(f"配置已迁移并保存到 {config_path}")
             config = migrated_config
 
         # Merge with defaults for new structure
         # Handle nested merging carefully
-        for section, section_defaults in default_config.items():
+        for section, section_defaults in DEFAULT_CONFIG.items():
             if isinstance(section_defaults, dict):
                 # For nested dicts, merge individually
                 if section not in config:
@@ -495,6 +520,8 @@ def load_and_validate_config(config_path: str = None) -> Dict[str, Any]:
     print(f"  短论文阈值: {validated_config['processing_settings']['short_paper_threshold']}页")
     print(f"  最大扫描限制: {validated_config['processing_settings']['max_scan_limit']}页")
 
+    with _config_cache_lock:
+        _config_cache[config_path] = (file_sig, copy.deepcopy(validated_config))
     return validated_config
 
 
@@ -0,0 +1,18 @@
+"""
+Shared pytest fixtures
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def isolated_ai_cache(tmp_path, monkeypatch):
+    """Keep the (default-on) AI result cache out of the working tree during tests"""
+    import processing
+    monkeypatch.setattr(processing, "AI_CACHE_DIR", str(tmp_path / "ai_results"))
@@ -3,11 +3,100 @@ Dual logging system for CFST Data Extractor
 Provides both console output (brief) and file output (detailed)
 """
 
+import atexit
 import logging
+import queue
 import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 
+class CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter that reuses the formatted timestamp within the same second.
+
+    Both datefmt values used here have one-second resolution, so a burst of
+    records only pays for localtime() + strftime() once per second.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (second, formatted string) swapped as one tuple so threads sharing
+        # the console formatter never see a mismatched pair
+        self._time_cache = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is None:
+            # Default format appends milliseconds; nothing to reuse
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, cached_text = self._time_cache
+        if second != cached_second:
+            cached_text = time.strftime(datefmt, self.converter(second))
+            self._time_cache = (second, cached_text)
+        return cached_text
+
+
+class BatchFileHandler(logging.FileHandler):
+    """
+    FileHandler that does not flush after every record.
+
+    Records accumulate in the stream's write buffer and reach the file in
+    larger blocks; WARNING and above are flushed immediately, everything
+    else when BatchingQueueListener finds the queue empty (or on close).
+    """
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    QueueListener that flushes its handlers whenever the queue is drained.
+
+    A burst of records is therefore written in one go, while an idle queue
+    still leaves the log file fully up to date.
+    """
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            if not block:
+                raise
+        for handler in self.handlers:
+            handler.flush()
+        return self.queue.get(block)
+
+
+# Background listener that drains records into the log file; replaced on
+# every setup_logger() call and flushed at interpreter exit.
+_file_listener = None
+
+
+def stop_file_listener():
+    """Flush pending records to the log file and stop the background writer."""
+    global _file_listener
+    if _file_listener is not None:
+        _file_listener.stop()
+        for handler in _file_listener.handlers:
+            handler.close()
+        _file_listener = None
+
+
+atexit.register(stop_file_listener)
+
+
 def setup_logger(log_file=None, console_level=logging.INFO, file_level=logging.DEBUG):
     """
     Configure dual logging system with console and file outputs.
@@ -24,12 +113,13 @@ def setup_logger(log_file=None, console_level=logging.INFO, file_level=logging.D
     logger.setLevel(logging.DEBUG)
 
     # Clear any existing handlers to avoid duplication
+    stop_file_listener()
     logger.handlers.clear()
 
     # Console Handler (increased information - show full page lists)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(console_level)
-    console_formatter = logging.Formatter(
+    console_formatter = CachedTimeFormatter(
         '%(asctime)s - %(levelname)s: %(message)s',
         datefmt='%H:%M:%S'
     )
@@ -41,13 +131,23 @@ def setup_logger(log_file=None, console_level=logging.INFO, file_level=logging.D
         log_path = Path(log_file)
         log_path.parent.mkdir(exist_ok=True, parents=True)
 
-        file_handler = logging.FileHandler(log_path, encoding='utf-8')
+        # delay=True: the file is opened by the listener thread on the first record
+        file_handler = BatchFileHandler(log_path, encoding='utf-8', delay=True)
         file_handler.setLevel(file_level)
-        file_formatter = logging.Formatter(
+        file_formatter = CachedTimeFormatter(
             '%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+
+        # 文件写入放到后台线程，记录日志时只需入队；批量记录合并写入；
+        # 控制台保持同步输出，以免与 print 的顺序错乱
+        global _file_listener
+        log_queue = queue.Queue(-1)
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.setLevel(file_level)
+        _file_listener = BatchingQueueListener(log_queue, file_handler, respect_handler_level=True)
+        _file_listener.start()
+        logger.addHandler(queue_handler)
 
     return logger
@@ -1,17 +1,25 @@
 import os
+import sys
 import json
 import shutil
+import tempfile
+import threading
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from datetime import datetime
-from typing import Optional
-from validation import validate_dataframe
+from typing import Optional, Dict, Any
+from validation import validate_records
 from styling import export_to_excel_with_styling, generate_validation_report
-from processing import process_pdf, process_from_cache
-from config_manager import load_and_validate_config, ConfigError, check_poppler_installation
+from processing import process_pdf, process_from_cache, is_clearly_non_cfst, clear_ai_cache, AI_CACHE_DIR
+from config_manager import load_and_validate_config, ConfigError, check_poppler_installation, write_text_atomic
 from logger import setup_logger
 import logging
 
+# Shared application logger (configured by setup_logger); resolved once here
+# instead of via logging.getLogger() at each call site
+logger = logging.getLogger('cfst_extractor')
+
 # Configuration
 # Base directory (script location)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -25,6 +33,16 @@ EXCLUDED_DIRECTORY = os.path.join(BASE_DIR, "Excluded")
 # Output Excel location (same as script directory)
 OUTPUT_DIRECTORY = BASE_DIR
 
+# Parallel file copies when importing PDFs from the Windows source folder
+IMPORT_COPY_WORKERS = 4
+
+# Specimen groups returned by the model (see SYSTEM_PROMPT)
+_GROUPS = ("Group_A", "Group_B", "Group_C")
+
+# OpenAI clients keyed by (api_key, base_url); reusing one client keeps its
+# HTTP connection pool warm across runs in the same process
+_CLIENT_CACHE: Dict[tuple, OpenAI] = {}
+
 
 # Column Mapping for Excel
 COL_MAPPING = {
@@ -156,68 +174,162 @@ SYSTEM_PROMPT = """
 ❌ WRONG: `{"is_valid": true, "reason": "The paper provides comprehensive experimental data..."}` (Too long)
 """
 
-def move_failed_file(file_path):
-    """将失败的文件移动到 NotInput 目录"""
-    if not os.path.exists(NOT_INPUT_DIRECTORY):
-        os.makedirs(NOT_INPUT_DIRECTORY)
-        print(f"Created directory: {NOT_INPUT_DIRECTORY}")
-    
-    filename = os.path.basename(file_path)
-    destination = os.path.join(NOT_INPUT_DIRECTORY, filename)
-    
-    try:
-        shutil.move(file_path, destination)
-        print(f"  -> Moved failed file to: {destination}")
-    except Exception as e:
-        print(f"  -> Error moving file {filename}: {e}")
+def get_client(api_key, base_url):
+    """
+    获取 OpenAI 客户端（同一 api_key/base_url 复用同一实例）
 
-def move_excluded_file(file_path):
-    """将不符合要求的文件移动到 Excluded 目录"""
-    if not os.path.exists(EXCLUDED_DIRECTORY):
-        os.makedirs(EXCLUDED_DIRECTORY)
-        print(f"Created directory: {EXCLUDED_DIRECTORY}")
+    Args:
+        api_key: API密钥
+        base_url: API地址
+
+    Returns:
+        OpenAI 客户端
+    """
+    key = (api_key, base_url)
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        client = OpenAI(api_key=api_key, base_url=base_url)
+        _CLIENT_CACHE[key] = client
+    return client
 
-    filename = os.path.basename(file_path)
-    destination = os.path.join(EXCLUDED_DIRECTORY, filename)
+def is_pdf_name(name):
+    """文件名是否以 .pdf 结尾（不区分大小写，只对后4个字符做小写转换）"""
+    return name[-4:].lower() == '.pdf'
+
+def get_pdf_files(directory):
+    """
+    列出目录下的PDF文件名（按名称排序）
+
+    使用 os.scandir 一次遍历目录，DirEntry 自带 name 与文件类型信息，
+    无需逐个拼接路径或额外 stat。
+
+    Args:
+        directory: 要扫描的目录
 
+    Returns:
+        PDF文件名列表
+    """
+    with os.scandir(directory) as it:
+        return sorted(
+            entry.name for entry in it
+            if entry.is_file() and is_pdf_name(entry.name)
+        )
+
+def walk_pdf_files(top):
+    """
+    递归遍历目录树，按 os.walk 的顺序（先当前目录，再依次进入子目录）产出PDF
+
+    基于 os.scandir 的显式栈实现，不构建每层的 dirs/files 列表，
+    直接使用 DirEntry.path；与 os.walk 一样不进入符号链接目录，
+    无法读取的目录静默跳过。
+
+    Args:
+        top: 根目录
+
+    Yields:
+        (文件名, 完整路径)
+    """
+    stack = [top]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            elif is_pdf_name(entry.name):
+                yield entry.name, entry.path
+
+        # 逆序入栈，保证子目录按列举顺序被访问
+        stack.extend(reversed(subdirs))
+
+
+def dir_has_entries(path):
+    """目录存在且非空时返回 True（读到第一个条目即停止，不列出整个目录）"""
     try:
-        shutil.move(file_path, destination)
-        print(f"  -> Moved excluded file to: {destination}")
-    except Exception as e:
-        print(f"  -> Error moving file {filename}: {e}")
+        with os.scandir(path) as it:
+            return next(it, None) is not None
+    except OSError:
+        return False
 
-def move_to_manual_review(file_path, config):
-    """将提取失败的文件移动到 Manual_Review 目录"""
-    paths = config.get("paths", {})
-    manual_review_path = paths.get("manual_review_path", "./Manual_Review")
+def get_manual_review_directory(config):
+    """Manual_Review 目录（可在 paths.manual_review_path 中配置）"""
+    return config.get("paths", {}).get("manual_review_path", "./Manual_Review")
 
-    if not os.path.exists(manual_review_path):
-        os.makedirs(manual_review_path, exist_ok=True)
-        print(f"  创建目录: {manual_review_path}")
+def ensure_move_directories(config):
+    """创建 NotInput / Excluded / Manual_Review 目录（由 process_files 在处理前调用一次，移动文件时不再逐个检查）"""
+    for directory in (NOT_INPUT_DIRECTORY, EXCLUDED_DIRECTORY, get_manual_review_directory(config)):
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            print(f"Created directory: {directory}")
 
-    filename = os.path.basename(file_path)
-    destination = os.path.join(manual_review_path, filename)
+def _move_file(file_path, dest_dir, moved_message, filename=None):
+    """
+    将文件移动到 dest_dir
+
+    目录通常已由 ensure_move_directories 预先创建；若目录不存在（如未经 main() 调用），
+    则创建目录后重试一次。
+    """
+    if filename is None:
+        filename = os.path.basename(file_path)
+    destination = os.path.join(dest_dir, filename)
 
     try:
-        shutil.move(file_path, destination)
-        print(f"  -> Moved to Manual_Review: {destination}")
+        try:
+            shutil.move(file_path, destination)
+        except FileNotFoundError:
+            if not os.path.exists(file_path):
+                raise
+            os.makedirs(dest_dir, exist_ok=True)
+            shutil.move(file_path, destination)
+        print(f"  -> {moved_message}: {destination}")
     except Exception as e:
         print(f"  -> Error moving file {filename}: {e}")
 
+def move_failed_file(file_path, filename=None):
+    """将失败的文件移动到 NotInput 目录"""
+    _move_file(file_path, NOT_INPUT_DIRECTORY, "Moved failed file to", filename)
+
+def move_excluded_file(file_path, filename=None):
+    """将不符合要求的文件移动到 Excluded 目录"""
+    _move_file(file_path, EXCLUDED_DIRECTORY, "Moved excluded file to", filename)
+
+def move_to_manual_review(file_path, config, filename=None):
+    """将提取失败的文件移动到 Manual_Review 目录"""
+    _move_file(file_path, get_manual_review_directory(config), "Moved to Manual_Review", filename)
+
+# Last state.json content read or written by this process; lets save_state()
+# skip rewriting the file when nothing changed
+_state_on_disk: Optional[str] = None
+
 def load_state():
     """Load state from state.json"""
+    global _state_on_disk
     state_path = os.path.join(BASE_DIR, "state.json")
+    today = datetime.now().strftime("%Y-%m-%d")
     default_state = {
         "batch_number": 1,
-        "last_archive_date": datetime.now().strftime("%Y-%m-%d"),
+        "last_archive_date": today,
         "total_archives": 0,
-        "last_import_date": datetime.now().strftime("%Y-%m-%d")
+        "last_import_date": today
     }
 
     try:
         if os.path.exists(state_path):
             with open(state_path, 'r', encoding='utf-8') as f:
-                state = json.load(f)
+                content = f.read()
+                state = json.loads(content)
+                _state_on_disk = content
                 # Ensure all required keys exist
                 for key, value in default_state.items():
                     if key not in state:
@@ -227,25 +339,56 @@ def load_state():
         else:
             print(f"State file not found at {state_path}, creating default")
             # Create default state file
-            with open(state_path, 'w', encoding='utf-8') as f:
-                json.dump(default_state, f, indent=2, ensure_ascii=False)
+            content = json.dumps(default_state, indent=2, ensure_ascii=False)
+            write_text_atomic(state_path, content)
+            _state_on_disk = content
             return default_state
     except Exception as e:
         print(f"Error loading state: {e}, using defaults")
         return default_state
 
 def save_state(state):
-    """Save state to state.json"""
+    """Save state to state.json (skipped when the content is unchanged)"""
+    global _state_on_disk
     state_path = os.path.join(BASE_DIR, "state.json")
     try:
-        with open(state_path, 'w', encoding='utf-8') as f:
-            json.dump(state, f, indent=2, ensure_ascii=False)
+        # Serialize first, then write in one call (json.dump issues a write per token)
+        content = json.dumps(state, indent=2, ensure_ascii=False)
+        if content == _state_on_disk:
+            print(f"State unchanged, skip writing {state_path}")
+            return
+        write_text_atomic(state_path, content)
+        _state_on_disk = content
         print(f"State saved to {state_path}")
     except Exception as e:
         print(f"Error saving state: {e}")
 
-def import_pdfs_from_windows(config):
-    """Import PDFs from Windows folder to files/ directory"""
+def is_case_insensitive_dir(directory):
+    """
+    directory 本身是否不区分大小写
+
+    在目录内创建一个临时探测文件，检查大小写互换后的文件名是否指向同一文件
+    （WSL/Windows 可按目录设置大小写敏感，不能以上级目录代替）；
+    目录不存在或不可写时按区分大小写处理。
+    """
+    try:
+        fd, probe = tempfile.mkstemp(prefix=".case_probe_", dir=directory)
+    except OSError:
+        return False
+    try:
+        os.close(fd)
+        swapped = os.path.join(directory, os.path.basename(probe).swapcase())
+        return os.path.exists(swapped) and os.path.samefile(probe, swapped)
+    finally:
+        os.remove(probe)
+
+def import_pdfs_from_windows(config, state=None):
+    """Import PDFs from Windows folder to files/ directory
+
+    Args:
+        config: 配置字典
+        state: 已加载的状态字典；传入时直接在其上更新，避免重复读取 state.json
+    """
     print("\n=== PDF Import Automation ===")
 
     # Check if source path exists
@@ -254,14 +397,27 @@ def import_pdfs_from_windows(config):
         print(f"Error: Source path does not exist: {source_path}")
         return False
 
+    # List files/ once; the same listing drives deletion and duplicate-name
+    # detection. Names are casefolded only if files/ itself is case-insensitive,
+    # so the result matches what os.path.exists would report for each name
+    existing_pdfs = []
+    taken_names = set()
+    name_key = str.casefold if is_case_insensitive_dir(TARGET_DIRECTORY) else str
+    if os.path.isdir(TARGET_DIRECTORY):
+        with os.scandir(TARGET_DIRECTORY) as it:
+            for entry in it:
+                taken_names.add(name_key(entry.name))
+                if entry.is_file() and is_pdf_name(entry.name):
+                    existing_pdfs.append(entry.name)
+
     # Delete existing PDFs if configured
     if config.get("delete_existing_before_import", True):
         print("Deleting existing PDFs in files/ directory...")
-        pdf_files = [f for f in os.listdir(TARGET_DIRECTORY) if f.lower().endswith('.pdf')]
         deleted_count = 0
-        for pdf_file in pdf_files:
+        for pdf_file in sorted(existing_pdfs):
             try:
                 os.remove(os.path.join(TARGET_DIRECTORY, pdf_file))
+                taken_names.discard(name_key(pdf_file))
                 deleted_count += 1
             except Exception as e:
                 print(f"  Warning: Could not delete {pdf_file}: {e}")
@@ -272,32 +428,44 @@ def import_pdfs_from_windows(config):
     copied_count = 0
     error_count = 0
 
-    for root, _, files in os.walk(source_path):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                source_file = os.path.join(root, file)
-                dest_file = os.path.join(TARGET_DIRECTORY, file)
-
-                # Handle duplicate filenames
-                counter = 1
-                base_name, ext = os.path.splitext(file)
-                while os.path.exists(dest_file):
-                    new_name = f"{base_name}_{counter}{ext}"
-                    dest_file = os.path.join(TARGET_DIRECTORY, new_name)
-                    counter += 1
-
-                try:
-                    shutil.copy2(source_file, dest_file)
+    # Resolve destination names first (sequential, so renames are deterministic)
+    copy_jobs = []
+    for file, source_file in walk_pdf_files(source_path):
+        # Handle duplicate filenames (checked against the listing, no stat per candidate)
+        dest_name = file
+        counter = 1
+        base_name, ext = os.path.splitext(file)
+        while name_key(dest_name) in taken_names:
+            dest_name = f"{base_name}_{counter}{ext}"
+            counter += 1
+        taken_names.add(name_key(dest_name))
+        copy_jobs.append((file, source_file, os.path.join(TARGET_DIRECTORY, dest_name)))
+
+    def copy_one(job):
+        file, source_file, dest_file = job
+        try:
+            shutil.copy2(source_file, dest_file)
+            return file, None
+        except Exception as e:
+            return file, e
+
+    # Copies from the Windows mount are I/O-bound; overlap them in a small pool
+    if copy_jobs:
+        with ThreadPoolExecutor(max_workers=min(IMPORT_COPY_WORKERS, len(copy_jobs))) as executor:
+            for file, error in executor.map(copy_one, copy_jobs):
+                if error is None:
                     copied_count += 1
                     print(f"  ✓ Copied: {file}")
-                except Exception as e:
+                else:
                     error_count += 1
-                    print(f"  ✗ Error copying {file}: {e}")
+                    print(f"  ✗ Error copying {file}: {error}")
 
     print(f"\nImport summary: {copied_count} PDFs copied, {error_count} errors")
 
-    # Update last import date in state
-    state = load_state()
+    # Update last import date in state (reuse the caller's copy so later
+    # save_state() calls in the same run do not write back a stale date)
+    if state is None:
+        state = load_state()
     state["last_import_date"] = datetime.now().strftime("%Y-%m-%d")
     save_state(state)
 
@@ -337,7 +505,7 @@ def archive_results(config, state):
     copied_items = 0
     for source_name, dest_path in items_to_copy:
         source_path = os.path.join(BASE_DIR, source_name)
-        if os.path.exists(source_path) and os.listdir(source_path):
+        if dir_has_entries(source_path):
             try:
                 shutil.copytree(source_path, dest_path, dirs_exist_ok=True)
                 copied_items += 1
@@ -375,23 +543,34 @@ def archive_results(config, state):
         for source_name, _ in items_to_copy:
             source_path = os.path.join(BASE_DIR, source_name)
             if os.path.exists(source_path):
-                for item in os.listdir(source_path):
-                    item_path = os.path.join(source_path, item)
+                # DirEntry 缓存了类型信息，无需逐项 stat
+                with os.scandir(source_path) as it:
+                    entries = list(it)
+                for entry in entries:
                     try:
-                        if os.path.isfile(item_path):
-                            os.remove(item_path)
-                        elif os.path.isdir(item_path):
-                            shutil.rmtree(item_path)
+                        if entry.is_file():
+                            os.remove(entry.path)
+                        elif entry.is_dir():
+                            shutil.rmtree(entry.path)
                     except Exception as e:
-                        print(f"  Warning: Could not clean {item_path}: {e}")
+                        print(f"  Warning: Could not clean {entry.path}: {e}")
         print("  Source folders cleaned")
 
     return True
 
+def remove_cache_dir(cache_dir: str) -> None:
+    """删除cache目录；目录已不存在时直接返回（不先做 exists 检查）"""
+    try:
+        shutil.rmtree(cache_dir)
+    except FileNotFoundError:
+        pass
+
 def archive_cache(
     cache_dir: str,
     pdf_name: str,
-    batch_number: int
+    batch_number: int,
+    config: Optional[Dict[str, Any]] = None,
+    date_str: Optional[str] = None
 ) -> Optional[str]:
     """
     将cache目录归档到指定位置
@@ -400,20 +579,24 @@ def archive_cache(
         cache_dir: cache目录路径
         pdf_name: PDF文件名（用于命名zip文件）
         batch_number: 批次号
+        config: 已加载的配置字典；为 None 时才读取 config.json
+        date_str: 归档目录日期（YYYY-MM-DD）；批处理时由调用方统一传入，为 None 时取当天
 
     Returns:
         归档文件路径（成功）或 None（失败）
     """
-    # Get archive base path from config
-    config = load_and_validate_config()
+    # Get archive base path from config (only load it if the caller has none)
+    if config is None:
+        config = load_and_validate_config()
     archive_base = config.get("paths", {}).get("archive_destination", "/mnt/e/Documents/data_extracted")
 
-    if not archive_base or not os.path.exists(archive_base):
+    if not archive_base or not os.path.isdir(archive_base):
         print(f"归档目标不存在: {archive_base}")
         return None
 
-    # Create archive directory path
-    date_str = datetime.now().strftime("%Y-%m-%d")
+    # Create archive directory path (one date per run, even across midnight)
+    if date_str is None:
+        date_str = datetime.now().strftime("%Y-%m-%d")
     archive_dir = os.path.join(archive_base, f"Dataset ({batch_number}) {date_str}")
 
     try:
@@ -422,36 +605,258 @@ def archive_cache(
 
         # Create zip file path (without .zip extension for make_archive)
         zip_path = os.path.join(archive_dir, f"{pdf_name}_images")
+        zip_file = f"{zip_path}.zip"
 
         # Check if zip already exists
-        if os.path.exists(f"{zip_path}.zip"):
-            print(f"归档已存在，跳过: {zip_path}.zip")
+        if os.path.isfile(zip_file):
+            print(f"归档已存在，跳过: {zip_file}")
             # Still remove the cache directory if zip exists
-            if os.path.exists(cache_dir):
-                shutil.rmtree(cache_dir)
-            return f"{zip_path}.zip"
+            remove_cache_dir(cache_dir)
+            return zip_file
 
-        # Create zip archive
-        shutil.make_archive(zip_path, 'zip', cache_dir)
+        # Create zip archive (make_archive returns the path it wrote)
+        zip_file = shutil.make_archive(zip_path, 'zip', cache_dir)
 
         # Verify zip was created and delete cache
-        if os.path.exists(f"{zip_path}.zip"):
+        if os.path.isfile(zip_file):
             # Delete cache directory after successful archiving
-            if os.path.exists(cache_dir):
-                shutil.rmtree(cache_dir)
-            print(f"归档成功: {zip_path}.zip")
-            return f"{zip_path}.zip"
+            remove_cache_dir(cache_dir)
+            print(f"归档成功: {zip_file}")
+            return zip_file
         else:
             print(f"归档失败: zip文件未创建")
             return None
 
     except Exception as e:
         print(f"归档失败: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error("归档失败: %s - %s", pdf_name, e, exc_info=True)
+        return None
+
+
+def process_single_file(
+    filename: str,
+    client,
+    config: Dict[str, Any],
+    batch_number: int,
+    run_date: Optional[str] = None
+) -> Optional[Dict[str, list]]:
+    """
+    处理单个PDF：提取图片 → 从cache调用API → 归档cache
+
+    失败、被排除或需人工复核的文件会在此处被移动到对应目录。
+
+    Args:
+        filename: TARGET_DIRECTORY 中的PDF文件名
+        client: OpenAI客户端
+        config: 配置字典
+        batch_number: 批次号（用于归档）
+        run_date: 本次运行的日期字符串（用于归档目录名）
+
+    Returns:
+        成功时返回 {组名: 试件数据列表}，否则返回 None
+    """
+    file_path = os.path.join(TARGET_DIRECTORY, filename)
+    pdf_name = os.path.splitext(filename)[0]
+
+    try:
+        print(f"\n--- Processing {filename} ---")
+
+        # Stage 0: Local text prefilter (no images, no API call)
+        if config.get("processing_settings", {}).get("enable_text_prefilter", True):
+            if is_clearly_non_cfst(file_path):
+                # 仅凭关键词判断，不直接排除：交给人工复核以免误删CFST文献
+                print(f"  - ⚠️  文本中未发现CFST相关关键词: {filename}，移至 Manual_Review（未调用API）")
+                move_to_manual_review(file_path, config, filename)
+                return None
+
+        # Stage 1: Extract images to cache
+        print("阶段1: 提取图片...")
+        cache_result = process_pdf(file_path, client, config, SYSTEM_PROMPT, mode="extract_only")
+
+        if not cache_result:
+            print(f"  ❌ 阶段1失败: 图片提取失败")
+            move_failed_file(file_path, filename)
+            return None
+
+        cache_info = cache_result
+        cache_dir = cache_info["cache_dir"]
+        image_paths = cache_info["image_paths"]
+
+        print(f"  ✅ 阶段1完成: 提取了{len(image_paths)}张图片")
+
+        # Stage 2: Process from cache
+        print("阶段2: 从cache调用API...")
+        json_data = process_from_cache(cache_dir, pdf_name, image_paths, client, config, SYSTEM_PROMPT)
+
+        if not json_data:
+            print(f"  ❌ 阶段2失败: API调用失败")
+            # Don't move PDF to NotInput - keep it for retry, but don't archive cache
+            return None
+
+        print("  ✅ 阶段2完成: API调用成功")
+
+        # Check validity first
+        is_valid = json_data.get("is_valid", True)
+
+        if not is_valid:
+            reason = json_data.get("reason", "No reason provided")
+            print(f"  - ⚠️  文件被排除: {filename}. 原因: {reason}")
+            move_excluded_file(file_path, filename)
+            return None
+
+        # Single pass over the groups: copy items with ref_no injected (the API
+        # result is left intact) and note whether the model returned anything
+        file_data = {}
+        any_group_data = False
+        for group in _GROUPS:
+            items = json_data.get(group)
+            if items:
+                any_group_data = True
+            if isinstance(items, list):
+                file_data[group] = [{**item, "ref_no": filename} for item in items]  # Force assign filename
+        success = any(file_data.values())  # If we found any items in any group
+
+        # Zero-data detection and handling
+        if not any_group_data:
+            print(f"  - ⚠️  警告: {filename} 未提取到数据，可能是跨页或非常规格式。")
+            print(f"      将文件移动到 Manual_Review 文件夹...")
+            move_to_manual_review(file_path, config, filename)
+            return None
+
+        if success:
+            print(f"  - ✅ 成功处理 {filename}")
+
+            # Stage 3: Archive cache
+            print("阶段3: 归档cache...")
+            archive_result = archive_cache(cache_dir, pdf_name, batch_number, config, run_date)
+
+            if archive_result:
+                print(f"  ✅ 阶段3完成: 归档到 {os.path.basename(archive_result)}")
+            else:
+                print(f"  ⚠️  阶段3警告: 归档失败，保留cache")
+
+            return file_data
+
+        print(f"  - ⚠️  警告: {filename} 数据为空")
+        move_to_manual_review(file_path, config, filename)
+        return None
+
+    except json.JSONDecodeError as e:
+        # JSON parsing/truncation error - move to Manual_Review
+        print(f"  - ❌ JSON解析失败: {filename}")
+        print(f"    错误: {str(e)}")
+        print(f"    截断内容预览: {e.doc[:200]}...")
+        move_to_manual_review(file_path, config, filename)
         return None
 
+    except Exception as e:
+        print(f"  - ❌ 处理失败: {filename} - {str(e)}")
+        move_failed_file(file_path, filename)
+        return None
+
+
+class _FilePrefixedStdout:
+    """
+    sys.stdout 代理：并发处理时为每个工作线程输出的每一行加上文件名前缀
+
+    前缀保存在线程局部变量中；未设置前缀的线程原样输出。
+    不完整的行先缓存在本线程，凑满一行后整体写出，避免不同文件的输出交错在同一行。
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def set_prefix(self, prefix):
+        self._local.prefix = prefix
+        self._local.pending = ""
+
+    def clear_prefix(self):
+        pending = getattr(self._local, "pending", "")
+        if pending:
+            self._write_lines([pending])
+        self._local.prefix = None
+        self._local.pending = ""
+
+    def _write_lines(self, lines):
+        prefix = self._local.prefix
+        with self._lock:
+            self._stream.write("".join(f"{prefix}{line}\n" for line in lines))
 
+    def write(self, text):
+        if getattr(self._local, "prefix", None) is None:
+            return self._stream.write(text)
+        *lines, self._local.pending = (self._local.pending + text).split("\n")
+        if lines:
+            self._write_lines(lines)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def process_files(pdf_files, client, config, batch_number, run_date, all_data):
+    """
+    处理所有PDF（concurrent_files > 1 时并发），并按文件顺序汇总结果
+
+    Args:
+        pdf_files: TARGET_DIRECTORY 中的PDF文件名列表
+        client: OpenAI客户端
+        config: 配置字典
+        batch_number: 批次号
+        run_date: 本次运行的日期字符串
+        all_data: {组名: 列表}，成功文件的数据按文件顺序追加到其中
+
+    Returns:
+        成功处理的文件数
+    """
+    # Create the move targets once up front rather than per moved file
+    ensure_move_directories(config)
+    max_workers = config.get("processing_settings", {}).get("concurrent_files", 1)
+
+    # With several workers, prefix every printed line with its file name so
+    # interleaved progress output stays readable
+    prefixed_stdout = _FilePrefixedStdout(sys.stdout) if max_workers > 1 else None
+
+    def run_one(filename):
+        if prefixed_stdout is not None:
+            prefixed_stdout.set_prefix(f"[{filename}] ")
+        try:
+            return process_single_file(filename, client, config, batch_number, run_date)
+        finally:
+            if prefixed_stdout is not None:
+                prefixed_stdout.clear_prefix()
+
+    if prefixed_stdout is not None:
+        sys.stdout = prefixed_stdout
+    try:
+        # Process files concurrently (network-bound API calls overlap across files);
+        # executor.map keeps results in file order so the Excel output is stable
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Bind the per-group extend methods once; count successes locally
+            extend_group = {group: items.extend for group, items in all_data.items()}
+            succeeded_files = 0
+            for file_data in executor.map(run_one, pdf_files):
+                if file_data:
+                    succeeded_files += 1
+                    for group, items in file_data.items():
+                        extend_group[group](items)
+    finally:
+        if prefixed_stdout is not None:
+            sys.stdout = prefixed_stdout._stream
+
+    return succeeded_files
+
+
+def apply_cli_overrides(config, args):
+    """将命令行开关写入已加载的配置（只影响本次运行，不写回 config.json）"""
+    if getattr(args, "no_ai_cache", False):
+        config.setdefault("processing_settings", {})["enable_ai_cache"] = False
+        print("已禁用AI结果缓存（--no-ai-cache）")
 
 def main():
     # Add command-line argument parsing
@@ -474,9 +879,23 @@ def main():
         type=str,
         help='PDF文件名（process_from_cache模式时使用）'
     )
+    parser.add_argument(
+        '--no-ai-cache',
+        action='store_true',
+        help='本次运行不读取也不写入AI结果缓存（覆盖 processing_settings.enable_ai_cache）'
+    )
+    parser.add_argument(
+        '--clear-ai-cache',
+        action='store_true',
+        help=f'运行前清空AI结果缓存目录 ({AI_CACHE_DIR})'
+    )
 
     args = parser.parse_args()
 
+    if args.clear_ai_cache:
+        clear_ai_cache()
+        print(f"已清空AI结果缓存: {AI_CACHE_DIR}")
+
     # Handle process_from_cache mode
     if args.mode == 'process_from_cache':
         if not args.cache_dir or not args.pdf_name:
@@ -498,16 +917,17 @@ def main():
 
         # Load config and client
         config = load_and_validate_config()
+        apply_cli_overrides(config, args)
         api_key = config['api_settings']['api_key']
         base_url = config['api_settings']['base_url']
-        client = OpenAI(api_key=api_key, base_url=base_url)
+        client = get_client(api_key, base_url)
 
-        # Scan for image files
-        image_paths = sorted([
-            os.path.join(args.cache_dir, f)
-            for f in os.listdir(args.cache_dir)
-            if f.endswith('.jpg')
-        ])
+        # Scan for image files (DirEntry.path is already joined)
+        with os.scandir(args.cache_dir) as it:
+            image_paths = sorted(
+                entry.path for entry in it
+                if entry.name.endswith('.jpg') and entry.is_file()
+            )
 
         if not image_paths:
             print(f"错误：cache目录中没有找到jpg图片: {args.cache_dir}")
@@ -527,7 +947,7 @@ def main():
 
             # Archive cache
             print("归档cache...")
-            archive_result = archive_cache(args.cache_dir, args.pdf_name, batch_number)
+            archive_result = archive_cache(args.cache_dir, args.pdf_name, batch_number, config)
 
             if archive_result:
                 print(f"✅ 归档成功: {archive_result}")
@@ -548,7 +968,7 @@ def main():
         client = None  # No API needed for extract_only
 
         # Process PDFs
-        pdf_files = [f for f in os.listdir(TARGET_DIRECTORY) if f.lower().endswith('.pdf')]
+        pdf_files = get_pdf_files(TARGET_DIRECTORY)
 
         if not pdf_files:
             print(f"没有找到PDF文件: {TARGET_DIRECTORY}")
@@ -576,20 +996,23 @@ def main():
     state = load_state()
     batch_number = state.get('batch_number', 1)
 
+    # Date for this run's log file and archive folders (formatted once)
+    run_date = datetime.now().strftime("%Y-%m-%d")
+
     # Setup logger with batch-based log file
-    log_file = f"./logs/Batch-{batch_number}_{datetime.now().strftime('%Y-%m-%d')}.log"
+    log_file = f"./logs/Batch-{batch_number}_{run_date}.log"
     logger = setup_logger(log_file=log_file, console_level=logging.INFO, file_level=logging.DEBUG)
 
     # Log batch start information (file only)
     logger.info("=" * 60)
-    logger.info(f"CFST Data Extractor - Batch #{batch_number}")
-    logger.info(f"日志文件: {log_file}")
+    logger.info("CFST Data Extractor - Batch #%s", batch_number)
+    logger.info("日志文件: %s", log_file)
     logger.info("=" * 60)
 
     # Check dependencies first
     poppler_ok, poppler_msg = check_poppler_installation()
     if not poppler_ok:
-        logger.error(f"Poppler检查失败: {poppler_msg}")
+        logger.error("Poppler检查失败: %s", poppler_msg)
         print(poppler_msg)
         return
 
@@ -597,14 +1020,15 @@ def main():
     try:
         config_path = os.path.join(BASE_DIR, "config.json")
         config = load_and_validate_config(config_path)
-        logger.debug(f"配置加载成功: {config}")
+        apply_cli_overrides(config, args)
+        logger.debug("配置加载成功: %s", config)
     except ConfigError as e:
-        logger.error(f"配置错误: {e}")
+        logger.error("配置错误: %s", e)
         print(f"配置错误: {e}")
         print("请检查 config.json 文件并修复上述问题")
         return
     except Exception as e:
-        logger.error(f"加载配置时出错: {e}")
+        logger.error("加载配置时出错: %s", e)
         print(f"加载配置时出错: {e}")
         return
 
@@ -617,7 +1041,7 @@ def main():
         print(f"Batch #{state.get('batch_number', 1)} - Last archive: {state.get('last_archive_date', 'Never')}")
 
         # Import PDFs
-        import_success = import_pdfs_from_windows(config)
+        import_success = import_pdfs_from_windows(config, state)
         if not import_success:
             logger.warning("PDF import failed or no PDFs found. Exiting workflow.")
             print("PDF import failed or no PDFs found. Exiting workflow.")
@@ -632,22 +1056,18 @@ def main():
 
         # Initialize OpenAI client without instructor patching for now
         # We'll use standard OpenAI client for vision API
-        client = OpenAI(api_key=api_key, base_url=base_url)
+        client = get_client(api_key, base_url)
 
-        logger.info(f"OpenAI client initialized with model: {model_name}")
+        logger.info("OpenAI client initialized with model: %s", model_name)
         print(f"OpenAI client initialized with model: {model_name}")
 
     except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {e}")
+        logger.error("Failed to initialize OpenAI client: %s", e)
         print(f"Failed to initialize OpenAI client: {e}")
         return
 
     # Storage for processed data
-    all_data = {
-        "Group_A": [],
-        "Group_B": [],
-        "Group_C": []
-    }
+    all_data = {group: [] for group in _GROUPS}
 
     # Verify directory exists
     if not os.path.exists(TARGET_DIRECTORY):
@@ -655,7 +1075,7 @@ def main():
         return
 
     # Iterate over files
-    pdf_files = [f for f in os.listdir(TARGET_DIRECTORY) if f.lower().endswith('.pdf')]
+    pdf_files = get_pdf_files(TARGET_DIRECTORY)
 
     if not pdf_files:
         print(f"No PDF files found in {TARGET_DIRECTORY}")
@@ -663,111 +1083,33 @@ def main():
 
     print(f"Found {len(pdf_files)} PDF files in {TARGET_DIRECTORY}")
 
-    for filename in pdf_files:
-        file_path = os.path.join(TARGET_DIRECTORY, filename)
-        pdf_name = os.path.splitext(filename)[0]
+    succeeded_files = process_files(pdf_files, client, config, batch_number, run_date, all_data)
 
-        try:
-            # Stage 1: Extract images to cache
-            print(f"\n--- Processing {filename} ---")
-            print("阶段1: 提取图片...")
-            cache_result = process_pdf(file_path, client, config, SYSTEM_PROMPT, mode="extract_only")
-
-            if not cache_result:
-                print(f"  ❌ 阶段1失败: 图片提取失败")
-                move_failed_file(file_path)
-                continue
-
-            cache_info = cache_result
-            cache_dir = cache_info["cache_dir"]
-            image_paths = cache_info["image_paths"]
-
-            print(f"  ✅ 阶段1完成: 提取了{len(image_paths)}张图片")
-
-            # Stage 2: Process from cache
-            print("阶段2: 从cache调用API...")
-            json_data = process_from_cache(cache_dir, pdf_name, image_paths, client, config, SYSTEM_PROMPT)
-
-            if not json_data:
-                print(f"  ❌ 阶段2失败: API调用失败")
-                # Don't move PDF to NotInput - keep it for retry, but don't archive cache
-                continue
-
-            print("  ✅ 阶段2完成: API调用成功")
-
-            # Check validity first
-            is_valid = json_data.get("is_valid", True)
-
-            if not is_valid:
-                reason = json_data.get("reason", "No reason provided")
-                print(f"  - ⚠️  文件被排除: {filename}. 原因: {reason}")
-                move_excluded_file(file_path)
-                continue
-
-            # Zero-data detection and handling
-            group_a = json_data.get("Group_A", [])
-            group_b = json_data.get("Group_B", [])
-            group_c = json_data.get("Group_C", [])
-
-            if not group_a and not group_b and not group_c:
-                print(f"  - ⚠️  警告: {filename} 未提取到数据，可能是跨页或非常规格式。")
-                print(f"      将文件移动到 Manual_Review 文件夹...")
-                move_to_manual_review(file_path, config)
-                continue
-
-            # Post-processing & Ref.No Injection
-            success = False
-            for group in ["Group_A", "Group_B", "Group_C"]:
-                if group in json_data and isinstance(json_data[group], list):
-                    for item in json_data[group]:
-                        item["ref_no"] = filename  # Force assign filename
-                        all_data[group].append(item)
-                    if json_data[group]: # If we found any items in any group
-                         success = True
-
-            if success:
-                print(f"  - ✅ 成功处理 {filename}")
-
-                # Stage 3: Archive cache
-                print("阶段3: 归档cache...")
-                archive_result = archive_cache(cache_dir, pdf_name, batch_number)
-
-                if archive_result:
-                    print(f"  ✅ 阶段3完成: 归档到 {os.path.basename(archive_result)}")
-                else:
-                    print(f"  ⚠️  阶段3警告: 归档失败，保留cache")
-
-            else:
-                print(f"  - ⚠️  警告: {filename} 数据为空")
-                move_to_manual_review(file_path, config)
-
-        except json.JSONDecodeError as e:
-            # JSON parsing/truncation error - move to Manual_Review
-            print(f"  - ❌ JSON解析失败: {filename}")
-            print(f"    错误: {str(e)}")
-            print(f"    截断内容预览: {e.doc[:200]}...")
-            move_to_manual_review(file_path, config)
-
-        except Exception as e:
-            print(f"  - ❌ 处理失败: {filename} - {str(e)}")
-            move_failed_file(file_path)
+    print(f"\n成功处理 {succeeded_files}/{len(pdf_files)} 个文件")
 
     # 4. Apply physical validation and prepare for export
     print("\nApplying physical validation...")
     validated_data = {}
     validation_reports = []
+    # Running totals for the summary, accumulated while validating each group
+    total_specimens = 0
+    total_manual_check = 0
 
     for group, items in all_data.items():
         if items:
-            df = pd.DataFrame(items)
-
-            # Ensure all expected columns exist
-            for col in COL_MAPPING.keys():
-                if col not in df.columns:
-                    df[col] = "" if col == "fcy150" else 0.0
-
-            # Apply physical validation
-            df_validated = validate_dataframe(df)
+            # Ensure all expected columns exist (fill fields no record provides)
+            present_keys = set().union(*items)
+            missing = {
+                col: "" if col == "fcy150" else 0.0
+                for col in COL_MAPPING.keys() if col not in present_keys
+            }
+
+            # Fill missing columns and apply physical validation in one pass over
+            # the records, then build the DataFrame once for reporting/export
+            validated_records = validate_records(items, fill=missing)
+            total_specimens += len(validated_records)
+            total_manual_check += sum(1 for record in validated_records if record['needs_manual_check'])
+            df_validated = pd.DataFrame(validated_records)
             validated_data[group] = df_validated
 
             # Generate validation report
@@ -787,12 +1129,6 @@ def main():
         print("Extraction complete. Data saved with validation and styling.")
 
         # Print summary statistics
-        total_specimens = sum(len(df) for df in validated_data.values() if df is not None)
-        total_manual_check = sum(
-            df['needs_manual_check'].sum() if df is not None and 'needs_manual_check' in df.columns else 0
-            for df in validated_data.values()
-        )
-
         print(f"\n=== Overall Summary ===")
         print(f"Total specimens extracted: {total_specimens}")
         print(f"Specimens needing manual check: {total_manual_check}")
@@ -18,17 +18,57 @@ Key Features:
 import re
 import os
 import base64
+import functools
+import hashlib
 import io
 import logging
 import json
-from typing import List, Tuple, Optional, Dict, Any
-from pdf2image import convert_from_path
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional, Dict, Any, Iterator
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 import pdfplumber
+from openai import OpenAIError
+
+from config_manager import write_text_atomic
+
+try:
+    import orjson
+except ImportError:  # optional: faster (de)serialization of the AI result cache
+    orjson = None
 
 # Get logger instance
 logger = logging.getLogger('cfst_extractor')
 
+# Threads used to encode/save page images (Pillow releases the GIL while compressing)
+IMAGE_WORKERS = min(8, os.cpu_count() or 1)
+
+# User turn sent with the page images (shared by process_pdf and process_from_cache)
+VISION_USER_MESSAGE = "请分析这些学术论文页面并提取CFST构件的试验数据。"
+
+# Generation temperature for vision requests (also part of the AI cache key)
+VISION_TEMPERATURE = 0.1
+
+# Vision API results cached on disk, keyed by image content + request parameters
+AI_CACHE_DIR = os.path.join("./cache", ".ai_results")
+# Specimen groups in an API result (a result with none of them is not cached)
+_RESULT_GROUPS = ("Group_A", "Group_B", "Group_C")
+
+# Keywords that any CFST paper is expected to mention at least once
+# (line breaks and Unicode hyphens between "concrete" and "filled" are common
+# in pdfplumber output)
+_CFST_HINT_RE = re.compile(
+    r'CFST|CFDST|\bCFTs?\b|钢管混凝土|concrete[\s\-\u2010\u2011\u2013]*filled|轴压|偏压',
+    re.IGNORECASE
+)
+# Characters of the previous page searched together with the next one, so a
+# keyword split across a page break is still found
+_PREFILTER_PAGE_OVERLAP = 64
+# Below this many characters the text layer is treated as missing (scanned PDF)
+MIN_PREFILTER_TEXT_LENGTH = 2000
+
 
 def parse_ai_response(response_content: str) -> Dict[str, Any]:
     """
@@ -49,8 +89,6 @@ def parse_ai_response(response_content: str) -> Dict[str, Any]:
         json.JSONDecodeError: If JSON is malformed or truncated
         Exception: For other parsing errors
     """
-    import json
-
     content = response_content.strip()
 
     # Remove markdown code block markers
@@ -111,10 +149,19 @@ def parse_ai_response(response_content: str) -> Dict[str, Any]:
 
 
 
+@functools.lru_cache(maxsize=32)
+def _compile_patterns(patterns: Tuple[str, ...]) -> Tuple["re.Pattern[str]", ...]:
+    """Compile a group of scoring patterns once per distinct pattern list (used only by score_page_content)."""
+    return tuple(re.compile(pattern) for pattern in patterns)
+
+
 def score_page_content(text: str, config: Dict[str, Any]) -> int:
     """
     Score page content based on keyword matches and patterns.
 
+    Note: not called by the current vision workflow (process_pdf sends pages
+    without text scoring); kept for the page_filtering design and tooling.
+
     Scoring rules:
     - Table titles: +10 points
     - Data keywords: +5 points
@@ -138,7 +185,6 @@ def score_page_content(text: str, config: Dict[str, Any]) -> int:
 
     score = 0
 
-    # Compile regex patterns for performance
     # Table patterns (high weight)
     table_patterns = patterns.get("table_patterns", [
         r'(?i)Table\s+\d+',
@@ -174,29 +220,15 @@ def score_page_content(text: str, config: Dict[str, Any]) -> int:
         r'(?i)Analytical\s+study'
     ])
 
-    # Apply table patterns (high weight)
-    table_weight = weights.get("table_weight", 40)
-    for pattern in table_patterns:
-        matches = re.findall(pattern, text)
-        score += len(matches) * table_weight
-
-    # Apply data patterns (medium weight)
-    data_weight = weights.get("data_weight", 5)
-    for pattern in data_patterns:
-        matches = re.findall(pattern, text)
-        score += len(matches) * data_weight
-
-    # Apply reference patterns (negative weight)
-    reference_weight = weights.get("reference_weight", -20)
-    for pattern in reference_patterns:
-        matches = re.findall(pattern, text)
-        score += len(matches) * reference_weight
-
-    # Apply simulation patterns (lighter negative weight)
-    simulation_weight = weights.get("simulation_weight", -10)
-    for pattern in simulation_patterns:
-        matches = re.findall(pattern, text)
-        score += len(matches) * simulation_weight
+    # Apply each pattern group with its weight (patterns compiled once per list)
+    for pattern_list, weight in (
+        (table_patterns, weights.get("table_weight", 40)),  # high weight
+        (data_patterns, weights.get("data_weight", 5)),  # medium weight
+        (reference_patterns, weights.get("reference_weight", -20)),  # negative weight
+        (simulation_patterns, weights.get("simulation_weight", -10)),  # lighter negative weight
+    ):
+        for pattern in _compile_patterns(tuple(pattern_list)):
+            score += len(pattern.findall(text)) * weight
 
     # Add base score for non-empty content (+1 per 10 words, minimum 1)
     base_weight = weights.get("base_weight", 1)
@@ -208,18 +240,19 @@ def score_page_content(text: str, config: Dict[str, Any]) -> int:
     return score
 
 
-def extract_page_texts(pdf_path: str) -> Dict[int, str]:
+def iter_page_texts(pdf_path: str) -> Iterator[Tuple[int, str]]:
     """
-    Extract text from all pages of a PDF using pdfplumber.
+    Lazily extract text page by page from a PDF using pdfplumber.
 
-    This function performs phase-one text scouting for smart page filtering.
-    It extracts text from all pages without converting to images or calling APIs.
+    Pages are parsed only as the caller consumes them, so callers that stop
+    early (e.g. after a keyword hit) never parse the rest of the document.
+    Each page's cached layout objects are released once its text is taken.
 
     Args:
         pdf_path: Path to the PDF file
 
-    Returns:
-        Dictionary mapping page numbers (1-indexed) to extracted text
+    Yields:
+        Tuples of (page number (1-indexed), extracted text)
 
     Raises:
         FileNotFoundError: If PDF file doesn't exist
@@ -229,20 +262,139 @@ def extract_page_texts(pdf_path: str) -> Dict[int, str]:
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
     try:
-        page_texts = {}
         with pdfplumber.open(pdf_path) as pdf:
             # Iterate through pages (1-indexed)
             for page_num, page in enumerate(pdf.pages, 1):
-                # Extract text from the page
+                # Extract text from the page, then drop its parsed objects
                 text = page.extract_text() or ""
-                page_texts[page_num] = text
-
-        return page_texts
+                page.flush_cache()
+                yield page_num, text
 
     except Exception as e:
         raise Exception(f"Text extraction failed: {str(e)}")
 
 
+def extract_page_texts(pdf_path: str) -> Dict[int, str]:
+    """
+    Extract text from all pages of a PDF using pdfplumber.
+
+    This function performs phase-one text scouting for smart page filtering.
+    It extracts text from all pages without converting to images or calling APIs.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        Dictionary mapping page numbers (1-indexed) to extracted text
+
+    Raises:
+        FileNotFoundError: If PDF file doesn't exist
+        Exception: If text extraction fails
+    """
+    return dict(iter_page_texts(pdf_path))
+
+
+def has_cfst_markers(text: str) -> bool:
+    """
+    Check whether text mentions any CFST-related keyword.
+
+    Args:
+        text: Text to search
+
+    Returns:
+        True if at least one CFST keyword is present
+    """
+    return _CFST_HINT_RE.search(text) is not None
+
+
+def is_clearly_non_cfst(pdf_path: str) -> bool:
+    """
+    Cheap local prefilter run before any image extraction or API call.
+
+    A PDF is only rejected when it has a substantial text layer and none of
+    the CFST keywords appear in it. Scanned PDFs (little or no text) and
+    PDFs whose text cannot be read are always passed on to the vision model.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        True if the PDF can be set aside (Manual_Review) without calling the API
+    """
+    # Pages are searched as they are parsed: the first keyword hit keeps the
+    # file and leaves the rest of the PDF unparsed. The tail of the previous
+    # page is searched along with each page, since "concrete-filled" may be
+    # split across the "\n" page separator.
+    page_texts = []
+    previous_tail = ""
+    try:
+        for _, page_text in iter_page_texts(pdf_path):
+            if has_cfst_markers(previous_tail + "\n" + page_text):
+                return False
+            page_texts.append(page_text)
+            previous_tail = page_text[-_PREFILTER_PAGE_OVERLAP:]
+    except Exception as e:
+        logger.warning("文本预筛选跳过: %s - %s", os.path.basename(pdf_path), e)
+        return False
+
+    return len("\n".join(page_texts).strip()) >= MIN_PREFILTER_TEXT_LENGTH
+
+
+# Regex patterns for the legacy text segmentation helpers, compiled once at import
+
+# Common section headers in academic papers (each implicitly preceded by \b)
+_SECTION_HEADERS = [
+    (r'abstract\b', 'abstract'),
+    (r'introduction\b', 'introduction'),
+    (r'methodology\b', 'methodology'),
+    (r'materials and methods\b', 'methodology'),
+    (r'experimental\b', 'experimental'),
+    (r'test results\b', 'results'),
+    (r'results and discussion\b', 'results'),
+    (r'conclusion\b', 'conclusion'),
+    (r'appendix\b', 'appendix'),
+    (r'table\s+\d+', 'table'),  # Table X
+    (r'figure\s+\d+', 'figure'),  # Figure X
+    (r'references\b', 'references'),
+]
+# All headers fused into one alternation (group h<i> -> _SECTION_HEADERS[i]) so
+# the text is scanned once; the first-letter lookahead skips most positions
+_SECTION_RE = re.compile(
+    r'\b(?=[' + ''.join(sorted({pattern[0] for pattern, _ in _SECTION_HEADERS})) + r'])(?:'
+    + '|'.join(f'(?P<h{i}>{pattern})' for i, (pattern, _) in enumerate(_SECTION_HEADERS))
+    + ')',
+    re.IGNORECASE
+)
+_SECTION_GROUP_NAMES = {f'h{i}': name for i, (_, name) in enumerate(_SECTION_HEADERS)}
+
+# Run of whitespace skipped between simple segments (same chars as str.isspace)
+_WS_RE = re.compile(r'\s+')
+
+# Section priority order used by build_intelligent_segments (lower goes first)
+_PRIORITY_SECTIONS = ('abstract', 'introduction', 'methodology', 'experimental',
+                      'table', 'figure', 'results', 'appendix')
+_PRIORITY_MAP = {name: i for i, name in enumerate(_PRIORITY_SECTIONS)}
+
+# Table title / figure caption line plus the line after it. The previous
+# lazy form "(?:.*?\n){1,20}?" always stopped after one line (nothing follows
+# it), so this is the same match written with negated classes only: no lazy
+# quantifiers or nested repetition to backtrack through.
+_TABLE_BLOCK_RE = re.compile(r'table\s+\d+[^\n]*\n[^\n]*\n', re.IGNORECASE)
+_FIGURE_BLOCK_RE = re.compile(r'figure\s+\d+[^\n]*\n[^\n]*\n', re.IGNORECASE)
+
+# Data indicators as one alternation; the alternatives never overlap (all are
+# whole \b-delimited tokens), so one scan counts the same hits as one per pattern
+_DATA_INDICATOR_RE = re.compile(
+    r'\b(?:'
+    r'\d+\.\d+'  # Decimal numbers
+    r'|mm|MPa|kN'  # Common units
+    r'|specimen|test|result'  # Data-related terms
+    r'|table|figure'  # Tables and figures
+    r')\b',
+    re.IGNORECASE
+)
+
+
 def segment_pdf_text_intelligently(text: str, max_length: int = 50000) -> List[str]:
     """
     Intelligently segment PDF text to preserve important sections.
@@ -286,30 +438,16 @@ def identify_important_sections(text: str) -> List[Tuple[str, int, int]]:
     """
     sections = []
 
-    # Common section headers in academic papers
-    section_patterns = [
-        (r'(?i)\babstract\b', 'abstract'),
-        (r'(?i)\bintroduction\b', 'introduction'),
-        (r'(?i)\bmethodology\b', 'methodology'),
-        (r'(?i)\bmaterials and methods\b', 'methodology'),
-        (r'(?i)\bexperimental\b', 'experimental'),
-        (r'(?i)\btest results\b', 'results'),
-        (r'(?i)\bresults and discussion\b', 'results'),
-        (r'(?i)\bconclusion\b', 'conclusion'),
-        (r'(?i)\bappendix\b', 'appendix'),
-        (r'(?i)\btable\s+\d+', 'table'),  # Table X
-        (r'(?i)\bfigure\s+\d+', 'figure'),  # Figure X
-        (r'(?i)\breferences\b', 'references'),
-    ]
-
-    # Find all matches
-    for pattern, section_name in section_patterns:
-        matches = list(re.finditer(pattern, text))
-        for match in matches:
-            sections.append((section_name, match.start(), match.end()))
-
-    # Sort by position
-    sections.sort(key=lambda x: x[1])
+    # Single left-to-right scan; matches come out in position order. Resume
+    # one character after each match start (not at its end) so overlapping
+    # headers such as "test results and discussion" are all reported.
+    search = _SECTION_RE.search
+    group_names = _SECTION_GROUP_NAMES
+    match = search(text)
+    while match is not None:
+        start = match.start()
+        sections.append((group_names[match.lastgroup], start, match.end()))
+        match = search(text, start + 1)
 
     # Merge adjacent sections and define boundaries
     merged_sections = []
@@ -351,58 +489,59 @@ def build_intelligent_segments(text: str, sections: List[Tuple[str, int, int]],
         List of segments
     """
     segments = []
-    current_segment = ""
+    # Pieces of the segment being built, joined with "\n\n" only when it is
+    # flushed (no repeated string concatenation); empty iff the segment is empty
+    current_chunks: List[str] = []
     current_length = 0
 
-    # Define priority order
-    priority_sections = ['abstract', 'introduction', 'methodology', 'experimental',
-                         'table', 'figure', 'results', 'appendix']
-
-    # Sort sections by priority and position
-    sorted_sections = []
-    for name, start, end in sections:
-        priority = priority_sections.index(name) if name in priority_sections else len(priority_sections)
-        sorted_sections.append((priority, start, end, name))
-
-    sorted_sections.sort(key=lambda x: (x[0], x[1]))
-
-    for priority, start, section_end, name in sorted_sections:
+    # Sort sections by priority (_PRIORITY_MAP, unknown names last) and position.
+    # All sections are consumed (overflow starts a new segment), so a full
+    # stable sort of the original tuples is all that is needed.
+    priority_of = _PRIORITY_MAP.get
+    lowest_priority = len(_PRIORITY_MAP)
+    sorted_sections = sorted(
+        sections,
+        key=lambda section: (priority_of(section[0], lowest_priority), section[1])
+    )
+
+    for name, start, section_end in sorted_sections:
         section_text = text[start:section_end]
         section_length = len(section_text)
 
         # If section fits in current segment, add it
         if current_length + section_length <= max_length:
-            if current_segment:
-                current_segment += "\n\n" + section_text
-            else:
-                current_segment = section_text
+            if current_chunks:
+                current_chunks.append(section_text)
+            elif section_text:
+                current_chunks = [section_text]
             current_length += section_length
         else:
             # If current segment has content, save it
-            if current_segment:
-                segments.append(current_segment)
+            if current_chunks:
+                segments.append("\n\n".join(current_chunks))
 
             # Start new segment with this section
             if section_length <= max_length:
-                current_segment = section_text
+                current_chunks = [section_text] if section_text else []
                 current_length = section_length
             else:
                 # Section is too large, split it
                 subsegments = segment_text_simple(section_text, max_length)
                 # First subsegment goes to current segment
-                current_segment = subsegments[0]
-                current_length = len(current_segment)
-                segments.append(current_segment)
+                first = subsegments[0]
+                current_chunks = [first] if first else []
+                current_length = len(first)
+                segments.append(first)
 
                 # Remaining subsegments become their own segments
                 for subsegment in subsegments[1:]:
                     segments.append(subsegment)
-                    current_segment = ""
+                    current_chunks = []
                     current_length = 0
 
     # Add final segment if any
-    if current_segment:
-        segments.append(current_segment)
+    if current_chunks:
+        segments.append("\n\n".join(current_chunks))
 
     # If no segments were created (e.g., no sections identified), fall back
     if not segments:
@@ -439,9 +578,10 @@ def segment_text_simple(text: str, max_length: int) -> List[str]:
         segments.append(text[start:end])
         start = end
 
-        # Skip whitespace at beginning of next segment
-        while start < text_length and text[start].isspace():
-            start += 1
+        # Skip whitespace at beginning of next segment (scanned in C by the regex engine)
+        whitespace = _WS_RE.match(text, start)
+        if whitespace:
+            start = whitespace.end()
 
     return segments
 
@@ -459,12 +599,9 @@ def extract_tables_and_figures(text: str) -> Tuple[List[str], List[str]]:
     tables = []
     figures = []
 
-    # Pattern for tables (simplified - in real implementation would use more sophisticated parsing)
-    table_pattern = r'(?i)table\s+\d+[^\n]*\n(?:.*?\n){1,20}?'  # Capture table title and some following lines
-    figure_pattern = r'(?i)figure\s+\d+[^\n]*\n(?:.*?\n){1,10}?'  # Capture figure caption
-
-    table_matches = re.finditer(table_pattern, text)
-    figure_matches = re.finditer(figure_pattern, text)
+    # Patterns for tables/figures (simplified - in real implementation would use more sophisticated parsing)
+    table_matches = _TABLE_BLOCK_RE.finditer(text)
+    figure_matches = _FIGURE_BLOCK_RE.finditer(text)
 
     for match in table_matches:
         tables.append(match.group())
@@ -485,21 +622,15 @@ def is_likely_data_section(text: str) -> bool:
     Returns:
         True if likely to contain data
     """
-    # Check for common data indicators
-    indicators = [
-        r'\b\d+\.\d+\b',  # Decimal numbers
-        r'\bmm\b', r'\bMPa\b', r'\bkN\b',  # Common units
-        r'\bspecimen\b', r'\btest\b', r'\bresult\b',  # Data-related terms
-        r'\btable\b', r'\bfigure\b',  # Tables and figures
-    ]
-
+    # Count common data indicators, stopping as soon as the threshold is passed
+    # (arbitrary threshold - adjust based on testing)
     score = 0
-    for pattern in indicators:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        score += len(matches)
+    for _ in _DATA_INDICATOR_RE.finditer(text):
+        score += 1
+        if score > 5:
+            return True
 
-    # Arbitrary threshold - adjust based on testing
-    return score > 5
+    return False
 
 
 
@@ -525,60 +656,16 @@ def get_page_count(pdf_path: str) -> int:
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
     try:
-        # Use pdf2image with first_page and last_page to count pages
-        # We'll try to convert just the first page to get metadata
-        images = convert_from_path(
-            pdf_path,
-            first_page=1,
-            last_page=1,
-            dpi=72,  # Low DPI for faster processing
-            fmt='ppm'  # Fast format
-        )
-
-        # If we can read the first page, the PDF is valid
-        # pdf2image doesn't directly provide page count, so we'll use a different approach
-        # Try to convert with a high page number and catch the error
-        try:
-            # Try to convert page 10000 - this will fail and tell us the actual page count
-            images = convert_from_path(
-                pdf_path,
-                first_page=1,
-                last_page=10000,
-                dpi=72,
-                fmt='ppm'
-            )
-            return len(images)
-        except Exception as e:
-            # Extract page count from error message if possible
-            error_str = str(e)
-            if "page" in error_str.lower() and "greater than" in error_str.lower():
-                # Try to extract the max page number from error
-                import re
-                match = re.search(r'(\d+)', error_str)
-                if match:
-                    return int(match.group(1))
-
-            # If we can't extract from error, we'll count manually
-            # This is slower but reliable
-            print(f"  警告: 无法快速获取页数，正在逐页统计...")
-            page_num = 0
-            while True:
-                try:
-                    images = convert_from_path(
-                        pdf_path,
-                        first_page=page_num + 1,
-                        last_page=page_num + 1,
-                        dpi=72,
-                        fmt='ppm'
-                    )
-                    if images:
-                        page_num += 1
-                    else:
-                        break
-                except:
-                    break
-            return page_num
+        # poppler 的 pdfinfo 只读取文档元数据，无需渲染任何页面
+        return int(pdfinfo_from_path(pdf_path)["Pages"])
+    except Exception as e:
+        pdfinfo_error = e
 
+    try:
+        # pdfinfo 不可用时退回 pdfplumber：解析页面树计数，同样不渲染
+        print(f"  警告: pdfinfo 获取页数失败 ({pdfinfo_error})，改用 pdfplumber 统计...")
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
     except Exception as e:
         raise Exception(f"无法读取PDF页数: {str(e)}")
 
@@ -653,8 +740,8 @@ def convert_pdf_to_images(
             )
 
         # Log success (console: brief, file: detailed)
-        logger.info(f"成功转换 {len(images)} 页为图片")
-        logger.debug(f"图片转换详情 - PDF: {pdf_path}, 页码: {page_numbers}, DPI: {dpi}, 格式: {fmt}")
+        logger.info("成功转换 %d 页为图片", len(images))
+        logger.debug("图片转换详情 - PDF: %s, 页码: %s, DPI: %s, 格式: %s", pdf_path, page_numbers, dpi, fmt)
 
         return images
 
@@ -687,7 +774,6 @@ def encode_image_to_base64(image: Image.Image, format: str = 'PNG') -> str:
         image_bytes = buffer.getvalue()
 
         # Encode to base64
-        import base64
         base64_encoded = base64.b64encode(image_bytes).decode('utf-8')
 
         # Create data URI
@@ -714,15 +800,20 @@ def encode_images_to_base64(images: List[Image.Image], format: str = 'PNG') -> L
     Raises:
         Exception: If encoding fails
     """
-    encoded_images = []
-    for idx, image in enumerate(images):
+    def encode(indexed_image):
+        idx, image = indexed_image
         try:
-            encoded = encode_image_to_base64(image, format)
-            encoded_images.append(encoded)
+            return encode_image_to_base64(image, format)
         except Exception as e:
             raise Exception(f"第 {idx + 1} 张图片编码失败: {str(e)}")
 
-    return encoded_images
+    if len(images) <= 1:
+        return [encode(indexed) for indexed in enumerate(images)]
+
+    # Pillow releases the GIL while compressing, so pages encode in parallel;
+    # map() keeps page order and re-raises the first failing page's error
+    with ThreadPoolExecutor(max_workers=min(len(images), IMAGE_WORKERS)) as executor:
+        return list(executor.map(encode, enumerate(images)))
 
 
 def build_vision_payload(
@@ -790,10 +881,6 @@ def call_vision_api(
     Raises:
         Exception: If all retries fail
     """
-    import time
-    import json
-    from openai import OpenAIError
-
     # Add model and parameters to payload
     payload["model"] = model_name
     payload["temperature"] = temperature
@@ -804,8 +891,9 @@ def call_vision_api(
     for attempt in range(max_retries):
         try:
             # Log API request summary (file only) - optimize by not logging base64 content
-            image_count = len([item for item in payload["messages"][1]["content"] if item["type"] == "image_url"])
-            logger.debug(f"API请求 - 模型: {model_name}, 图片: {image_count}, max_tokens: {max_tokens}")
+            if logger.isEnabledFor(logging.DEBUG):
+                image_count = sum(1 for item in payload["messages"][1]["content"] if item["type"] == "image_url")
+                logger.debug("API请求 - 模型: %s, 图片: %s, max_tokens: %s", model_name, image_count, max_tokens)
             # Note: Full payload with base64 excluded to reduce log size
 
             # Make API call
@@ -817,11 +905,12 @@ def call_vision_api(
                 content = response.choices[0].message.content
 
                 # Log API response (file only) - optimize for large responses
-                logger.debug(f"API响应长度: {len(content)} 字符")
-                if len(content) > 1000:
-                    logger.debug(f"响应预览: {content[:500]}...")
-                else:
-                    logger.debug(f"完整响应内容: {content}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("API响应长度: %d 字符", len(content))
+                    if len(content) > 1000:
+                        logger.debug("响应预览: %s...", content[:500])
+                    else:
+                        logger.debug("完整响应内容: %s", content)
 
                 # Parse response using new function with truncation detection
                 try:
@@ -840,13 +929,13 @@ def call_vision_api(
 
         except OpenAIError as e:
             last_error = e
-            logger.error(f"API调用失败 (attempt {attempt + 1}/{max_retries}): {e}")
+            logger.error("API调用失败 (attempt %d/%d): %s", attempt + 1, max_retries, e)
 
             # Check if we should retry
             if attempt < max_retries - 1:
                 # Exponential backoff
                 wait_time = (2 ** attempt) * 2  # 2, 4, 8 seconds
-                logger.info(f"等待{wait_time}秒后重试...")
+                logger.info("等待%s秒后重试...", wait_time)
                 time.sleep(wait_time)
             else:
                 break
@@ -936,12 +1025,16 @@ def process_pdf(
         cache_dir = os.path.join("./cache", pdf_name)
         os.makedirs(cache_dir, exist_ok=True)
 
-        image_paths = []
-        for page_num, image in zip(pages_to_process, images):
-            image_path = os.path.join(cache_dir, f"{page_num}.jpg")
+        image_paths = [os.path.join(cache_dir, f"{page_num}.jpg") for page_num in pages_to_process[:len(images)]]
+
+        def save_page(path_and_image):
+            image_path, image = path_and_image
             # Save as JPEG with quality 95
             image.save(image_path, 'JPEG', quality=95)
-            image_paths.append(image_path)
+
+        # JPEG compression releases the GIL, so pages are written in parallel
+        with ThreadPoolExecutor(max_workers=max(1, min(len(images), IMAGE_WORKERS))) as executor:
+            list(executor.map(save_page, zip(image_paths, images)))
 
         print(f"      已保存到 cache: {cache_dir}")
 
@@ -961,7 +1054,7 @@ def process_pdf(
         payload = build_vision_payload(
             encoded_images,
             system_prompt,
-            user_message="请分析这些学术论文页面并提取CFST构件的试验数据。"
+            user_message=VISION_USER_MESSAGE
         )
         print(f"      请求包含 {len(encoded_images)} 张图片")
 
@@ -976,7 +1069,7 @@ def process_pdf(
             client,
             payload,
             model_name,
-            temperature=0.1,
+            temperature=VISION_TEMPERATURE,
             max_tokens=max_tokens
         )
 
@@ -989,20 +1082,134 @@ def process_pdf(
 
     except Exception as e:
         # General error - log to both console and file
-        logger.error(f"处理失败: {filename} - {str(e)}")
-        logger.exception("完整异常堆栈:")
+        logger.error("处理失败: %s - %s", filename, e, exc_info=True)
 
         print(f"  ❌ 处理失败: {str(e)}")
         return None
 
 
+def get_ai_cache_key(
+    image_paths: List[str],
+    system_prompt: str,
+    user_message: str,
+    model_name: str,
+    base_url: Optional[str],
+    temperature: float,
+    max_tokens: int
+) -> str:
+    """
+    Build a cache key for a vision API request from its inputs.
+
+    The key is a BLAKE2b digest over the request parameters and the raw bytes
+    of every page image, so identical pages sent with the same prompts to the
+    same endpoint and model map to the same cached result.
+
+    Args:
+        image_paths: Paths of the page images sent to the API (order matters)
+        system_prompt: System prompt for the AI model
+        user_message: User turn sent with the page images
+        model_name: Model name used for the request
+        base_url: API endpoint (the same model name may differ between providers)
+        temperature: Generation temperature
+        max_tokens: Maximum tokens to generate
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (model_name or "", base_url or "", repr(temperature), str(max_tokens),
+                 system_prompt, user_message):
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\0")
+
+    for path in image_paths:
+        with open(path, 'rb') as f:
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: read and hash in C into the running digest
+                hashlib.file_digest(f, lambda: digest)
+            else:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def load_cached_ai_result(cache_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a previously cached vision API result.
+
+    Args:
+        cache_key: Key from get_ai_cache_key()
+
+    Returns:
+        Cached result dictionary, or None on a cache miss/unreadable entry
+    """
+    cache_path = os.path.join(AI_CACHE_DIR, f"{cache_key}.json")
+    try:
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+        return orjson.loads(data) if orjson else json.loads(data)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("AI结果缓存读取失败，将重新调用API: %s - %s", cache_path, e)
+        return None
+
+
+def is_cacheable_result(result: Any) -> bool:
+    """
+    Check whether an API result is worth caching.
+
+    Only results the pipeline accepts are stored: is_valid is not false and
+    at least one group has data. Rejected or empty answers are not cached,
+    so a retry of an Excluded/Manual_Review file asks the model again.
+
+    Args:
+        result: Parsed API result
+
+    Returns:
+        True if the result may be saved with save_ai_result()
+    """
+    if not isinstance(result, dict) or not result.get("is_valid", True):
+        return False
+    return any(isinstance(result.get(group), list) and result.get(group) for group in _RESULT_GROUPS)
+
+
+def save_ai_result(cache_key: str, result: Dict[str, Any]) -> None:
+    """
+    Store a successful vision API result in the on-disk cache.
+
+    Args:
+        cache_key: Key from get_ai_cache_key()
+        result: Parsed API result
+    """
+    try:
+        os.makedirs(AI_CACHE_DIR, exist_ok=True)
+        cache_path = os.path.join(AI_CACHE_DIR, f"{cache_key}.json")
+        if orjson:
+            content = orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        else:
+            content = json.dumps(result, ensure_ascii=False)
+        # Atomic replace: concurrent duplicates or a crash never leave a truncated entry
+        write_text_atomic(cache_path, content)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("AI结果缓存写入失败: %s", e)
+
+
+def clear_ai_cache() -> None:
+    """Delete all cached vision API results."""
+    shutil.rmtree(AI_CACHE_DIR, ignore_errors=True)
+
+
 def process_from_cache(
     cache_dir: str,
     pdf_name: str,
     image_paths: List[str],
     client,
     config: Dict[str, Any],
-    system_prompt: str
+    system_prompt: str,
+    use_cache: Optional[bool] = None
 ) -> Optional[Dict[str, Any]]:
     """
     第二阶段：从cache读取图片并调用API
@@ -1014,6 +1221,8 @@ def process_from_cache(
         client: OpenAI客户端
         config: 配置字典
         system_prompt: 系统提示词
+        use_cache: 是否复用/保存AI结果缓存；None 时读取
+            processing_settings.enable_ai_cache（缺省为缓存，与配置默认值一致）
 
     Returns:
         提取的数据字典（成功）或 None（失败）
@@ -1021,7 +1230,27 @@ def process_from_cache(
     print(f"  📂 从cache读取: {os.path.basename(cache_dir)}")
     print(f"      图片数: {len(image_paths)}")
 
+    if use_cache is None:
+        use_cache = config.get("processing_settings", {}).get("enable_ai_cache", True)
+
     try:
+        api_settings = config.get("api_settings", {})
+        model_name = api_settings.get("model_name")
+        processing_settings = config.get("processing_settings", {})
+        max_tokens = processing_settings.get("max_tokens", 8192)
+
+        # Identical pages + prompts + endpoint + model → reuse the earlier API result
+        cache_key = None
+        if use_cache:
+            cache_key = get_ai_cache_key(
+                image_paths, system_prompt, VISION_USER_MESSAGE, model_name,
+                api_settings.get("base_url"), VISION_TEMPERATURE, max_tokens
+            )
+            cached_result = load_cached_ai_result(cache_key)
+            if cached_result is not None:
+                print(f"  ✅ 命中AI结果缓存，跳过API调用")
+                return cached_result
+
         # Read images from cache
         images = []
         for path in image_paths:
@@ -1035,33 +1264,29 @@ def process_from_cache(
         payload = build_vision_payload(
             encoded_images,
             system_prompt,
-            user_message="请分析这些学术论文页面并提取CFST构件的试验数据。"
+            user_message=VISION_USER_MESSAGE
         )
 
         # Call vision API
-        api_settings = config.get("api_settings", {})
-        model_name = api_settings.get("model_name")
-        processing_settings = config.get("processing_settings", {})
-        max_tokens = processing_settings.get("max_tokens", 8192)
-
         result = call_vision_api(
             client,
             payload,
             model_name,
-            temperature=0.1,
+            temperature=VISION_TEMPERATURE,
             max_tokens=max_tokens
         )
 
         if result:
             print(f"  ✅ 从cache处理成功！")
+            if cache_key is not None and is_cacheable_result(result):
+                save_ai_result(cache_key, result)
         else:
             print(f"  ❌ 从cache处理失败")
 
         return result
 
     except Exception as e:
-        logger.error(f"从cache处理失败: {pdf_name} - {str(e)}")
-        logger.exception("完整异常堆栈:")
+        logger.error("从cache处理失败: %s - %s", pdf_name, e, exc_info=True)
 
         print(f"  ❌ 从cache处理失败: {str(e)}")
         return None
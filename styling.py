@@ -3,9 +3,38 @@ Excel styling functions for CFST data export (Workflow 2.0)
 Based on requirements spec: 06-requirements-spec.md
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
 
+from openpyxl.styles import Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+
+from validation import count_xi_zones
+
+MANUAL_CHECK_COLOR = 'FFCCCC'
+_TRUE_STRINGS = ('true', '1', 'yes')
+
+
+def manual_check_mask(values: pd.Series) -> np.ndarray:
+    """
+    Coerce a 'Needs Manual Check' column to a boolean mask in one pass.
+
+    Accepts bool, numeric (non-zero means True) and string ('true'/'1'/'yes',
+    case-insensitive) representations; anything else, including NaN/None,
+    is treated as False.
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return values.fillna(False).to_numpy(dtype=bool)
+    if pd.api.types.is_numeric_dtype(values):
+        return (values.fillna(0) != 0).to_numpy()
+
+    # object 列可能混合 bool/数字/字符串
+    text = values.where(values.map(type) == str)
+    mask = text.str.lower().isin(_TRUE_STRINGS).to_numpy()
+    numeric = pd.to_numeric(values.where(text.isna()), errors='coerce')
+    return mask | (numeric.fillna(0) != 0).to_numpy()
+
 
 def apply_excel_styling(df: pd.DataFrame, writer: pd.ExcelWriter, sheet_name: str):
     """
@@ -21,67 +50,44 @@ def apply_excel_styling(df: pd.DataFrame, writer: pd.ExcelWriter, sheet_name: st
         writer: pandas ExcelWriter object
         sheet_name: Name of the Excel sheet
     """
-    # Create a styled DataFrame
-    styled_df = df.copy()
-
-    # Define styling function for manual check highlighting
-    def highlight_manual_check(row):
-        """
-        Apply light red background to rows needing manual review.
-        """
-        # 使用重命名后的列名 'Needs Manual Check'
-        if 'Needs Manual Check' in row.index:
-            needs_check = row['Needs Manual Check']
-            # 处理各种可能的布尔值表示：True/False, 1/0, 'True'/'False'
-            if isinstance(needs_check, bool) and needs_check:
-                return ['background-color: #FFCCCC'] * len(row)
-            elif isinstance(needs_check, (int, float)) and needs_check:
-                return ['background-color: #FFCCCC'] * len(row)
-            elif isinstance(needs_check, str) and needs_check.lower() in ('true', '1', 'yes'):
-                return ['background-color: #FFCCCC'] * len(row)
-        return [''] * len(row)
+    # Export data without Styler; formatting is applied directly via openpyxl
+    df.to_excel(writer, sheet_name=sheet_name, index=False)
 
     # Apply styling if DataFrame is not empty
     if not df.empty:
-        # Create a Styler object
-        styler = df.style
-
-        # Apply center alignment first (基础样式)
-        all_columns = df.columns.tolist()
-        columns_to_center = [col for col in all_columns if col != 'Ref.No.']
-        if columns_to_center:
-            center_style = {'text-align': 'center'}
-            styler = styler.set_properties(subset=columns_to_center, **center_style)
-
-        # Apply highlighting for manual check rows (叠加样式)
-        if 'Needs Manual Check' in df.columns:
-            styler = styler.apply(highlight_manual_check, axis=1)
+        worksheet = writer.sheets[sheet_name]
 
-        # Export styled DataFrame to Excel
-        styler.to_excel(writer, sheet_name=sheet_name, index=False)
+        # 共享样式对象，openpyxl 会在工作簿内去重
+        center = Alignment(horizontal='center')
+        highlight = PatternFill(fill_type='solid', fgColor=MANUAL_CHECK_COLOR)
 
-        # Get the workbook and worksheet for additional formatting
-        workbook = writer.book
-        worksheet = writer.sheets[sheet_name]
+        # Center alignment for all columns except Ref.No. (基础样式)
+        centered = [col != 'Ref.No.' for col in df.columns]
 
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter  # Get the column name
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            worksheet.column_dimensions[column_letter].width = adjusted_width
+        # Highlighting for manual check rows (叠加样式)
+        if 'Needs Manual Check' in df.columns:
+            mask = manual_check_mask(df['Needs Manual Check'])
+        else:
+            mask = np.zeros(len(df), dtype=bool)
+
+        for row, flagged in zip(worksheet.iter_rows(min_row=2, max_col=len(df.columns)), mask):
+            for cell, center_cell in zip(row, centered):
+                if center_cell:
+                    cell.alignment = center
+                if flagged:
+                    cell.fill = highlight
+
+        # Auto-adjust column widths (computed from the DataFrame, not the sheet)
+        # map(str) rather than astype(str): newer pandas keeps NaN missing under
+        # astype(str), which would turn an all-empty column's width into NaN
+        cell_lengths = df.apply(lambda column: column.map(str).str.len().max()).to_numpy()
+        header_lengths = [len(str(col)) for col in df.columns]
+        widths = np.minimum(np.maximum(cell_lengths, header_lengths) + 2, 50)  # Cap at 50 characters
+        for col_idx, width in enumerate(widths, 1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = int(width)
 
         # Freeze header row
         worksheet.freeze_panes = 'A2'
-    else:
-        # Export empty DataFrame without styling
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
 
 
 def reorder_columns_for_export(df: pd.DataFrame, col_mapping: Dict[str, str]) -> pd.DataFrame:
@@ -103,34 +109,24 @@ def reorder_columns_for_export(df: pd.DataFrame, col_mapping: Dict[str, str]) ->
     # Start with original columns in correct order
     original_columns = list(col_mapping.keys())
 
-    # Ensure all original columns exist
-    for col in original_columns:
-        if col not in df.columns:
-            df[col] = ""
-
-    # Create new column order
+    # Create new column order without touching the DataFrame
     new_order = []
-
-    # Add original columns up to n_exp
     for col in original_columns:
         new_order.append(col)
         # Insert source_evidence right after n_exp
         if col == 'n_exp':
-            if 'source_evidence' in df.columns:
-                new_order.append('source_evidence')
-            else:
-                df['source_evidence'] = ""
-                new_order.append('source_evidence')
+            new_order.append('source_evidence')
 
     # Add validation columns at the end
     validation_columns = ['N_theory', 'xi', 'needs_manual_check']
-    for col in validation_columns:
-        if col not in df.columns:
-            df[col] = "" if col == 'needs_manual_check' else 0.0
-        new_order.append(col)
+    new_order.extend(validation_columns)
 
-    # Select columns in new order
-    result_df = df[new_order].copy()
+    # Select columns in new order with a single reindex; missing columns are
+    # filled with "" (numeric validation columns default to 0.0)
+    result_df = df.reindex(columns=new_order, fill_value="")
+    for col in ('N_theory', 'xi'):
+        if col not in df.columns:
+            result_df[col] = 0.0
 
     # Rename columns according to mapping
     rename_dict = col_mapping.copy()
@@ -207,14 +203,12 @@ def generate_validation_report(df: pd.DataFrame, group_name: str) -> str:
         return f"Group {group_name}: No validation data available"
 
     total = len(df)
-    needs_check = df['needs_manual_check'].sum()
+    needs_check = int(manual_check_mask(df['needs_manual_check']).sum())
     percentage = (needs_check / total * 100) if total > 0 else 0
 
     # Count by zone
     if 'xi' in df.columns:
-        green = ((df['xi'] > 0.8) & (df['xi'] < 2.5)).sum()
-        red = ((df['xi'] > 10) | (df['xi'] < 0.1)).sum()
-        yellow = total - green - red
+        green, yellow, red = count_xi_zones(df['xi'])
     else:
         green = red = yellow = 0
 
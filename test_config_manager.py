@@ -0,0 +1,124 @@
+"""
+Unit tests for configuration loading
+
+Test coverage:
+- load_and_validate_config memoization
+- cache invalidation when config.json changes on disk
+"""
+
+import os
+import sys
+import json
+import pytest
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import load_and_validate_config, clear_config_cache, write_text_atomic
+
+
+def write_config(path, model_name="test-model"):
+    """Write a minimal valid config.json"""
+    config = {
+        "api_settings": {
+            "api_key": "sk-test",
+            "base_url": "https://example.com/v1",
+            "model_name": model_name
+        },
+        "processing_settings": {
+            "short_paper_threshold": 15,
+            "max_scan_limit": 10,
+            "image_dpi": 150
+        },
+        "paths": {
+            "windows_source_path": "/tmp/source",
+            "archive_destination": "/tmp/archive"
+        }
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+class TestConfigCache:
+    """Test memoization in load_and_validate_config"""
+
+    def setup_method(self):
+        clear_config_cache()
+
+    def test_repeated_load_reuses_cache(self):
+        """Test that an unchanged config file is parsed only once"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, "config.json")
+            write_config(config_path)
+
+            first = load_and_validate_config(config_path)
+            with patch('config_manager.validate_config') as mock_validate:
+                second = load_and_validate_config(config_path)
+                mock_validate.assert_not_called()
+
+            assert second == first
+
+    def test_cached_config_is_copied(self):
+        """Test that mutating a returned config does not leak into the cache"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, "config.json")
+            write_config(config_path)
+
+            first = load_and_validate_config(config_path)
+            first["api_settings"]["model_name"] = "mutated"
+
+            second = load_and_validate_config(config_path)
+            assert second["api_settings"]["model_name"] == "test-model"
+
+    def test_modified_file_is_reloaded(self):
+        """Test that editing config.json invalidates the cached entry"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, "config.json")
+            write_config(config_path)
+            load_and_validate_config(config_path)
+
+            write_config(config_path, model_name="another-model-name")
+            reloaded = load_and_validate_config(config_path)
+
+            assert reloaded["api_settings"]["model_name"] == "another-model-name"
+
+    def test_missing_file_raises(self):
+        """Test that a missing config file still raises FileNotFoundError"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(FileNotFoundError):
+                load_and_validate_config(os.path.join(tmpdir, "missing.json"))
+
+
+class TestWriteTextAtomic:
+    """Test atomic file replacement"""
+
+    def test_replaces_content_without_temp_file(self):
+        """Test that the target is replaced and no .tmp file is left behind"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.json")
+            write_text_atomic(path, '{"batch_number": 1}')
+            write_text_atomic(path, '{"batch_number": 2}')
+
+            with open(path, encoding='utf-8') as f:
+                assert json.load(f) == {"batch_number": 2}
+            assert os.listdir(tmpdir) == ["state.json"]
+
+    def test_failed_write_keeps_original(self):
+        """Test that a failure before os.replace leaves the old file intact"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.json")
+            write_text_atomic(path, "old")
+
+            with patch("config_manager.os.fsync", side_effect=OSError("disk full")):
+                with pytest.raises(OSError):
+                    write_text_atomic(path, "new")
+
+            with open(path, encoding='utf-8') as f:
+                assert f.read() == "old"
+            assert os.listdir(tmpdir) == ["state.json"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
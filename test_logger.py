@@ -0,0 +1,151 @@
+"""
+Unit tests for the logging setup
+
+Test coverage:
+- CachedTimeFormatter output and same-second timestamp reuse
+- BatchFileHandler buffering and flush-on-WARNING
+- BatchingQueueListener flushing once per drained burst
+- setup_logger / stop_file_listener writing every record to the log file
+"""
+
+import os
+import sys
+import queue
+import logging
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logger as logger_module
+from logger import CachedTimeFormatter, BatchFileHandler, BatchingQueueListener, setup_logger, stop_file_listener
+
+
+def make_record(message, level=logging.INFO):
+    return logging.LogRecord("cfst_extractor", level, __file__, 1, message, None, None)
+
+
+@pytest.fixture
+def file_handler(tmp_path):
+    handler = BatchFileHandler(tmp_path / "run.log", encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    yield handler
+    handler.close()
+
+
+class TestCachedTimeFormatter:
+    """Test that timestamps are reused within the same second"""
+
+    @staticmethod
+    def record_at(created):
+        record = make_record("msg")
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        return record
+
+    @pytest.mark.parametrize("datefmt", ["%H:%M:%S", "%Y-%m-%d %H:%M:%S", None])
+    def test_output_matches_standard_formatter(self, datefmt):
+        fmt = "%(asctime)s - %(levelname)s: %(message)s"
+        cached = CachedTimeFormatter(fmt, datefmt=datefmt)
+        standard = logging.Formatter(fmt, datefmt=datefmt)
+
+        for created in (1700000000.1, 1700000000.9, 1700000001.0, 1700000000.5):
+            record = self.record_at(created)
+            assert cached.format(record) == standard.format(record)
+
+    def test_same_second_reuses_formatted_time(self):
+        formatter = CachedTimeFormatter("%(asctime)s", datefmt="%H:%M:%S")
+        formatter.converter = Mock(wraps=time.localtime)
+
+        first = formatter.format(self.record_at(1700000000.1))
+        second = formatter.format(self.record_at(1700000000.9))
+        assert first == second
+        assert formatter.converter.call_count == 1
+
+        formatter.format(self.record_at(1700000001.0))
+        assert formatter.converter.call_count == 2
+
+
+class TestBatchFileHandler:
+    """Test that records are buffered until a flush"""
+
+    def test_info_records_stay_buffered(self, file_handler):
+        for i in range(5):
+            file_handler.emit(make_record(f"info {i}"))
+
+        assert open(file_handler.baseFilename, encoding="utf-8").read() == ""
+
+        file_handler.flush()
+        assert open(file_handler.baseFilename, encoding="utf-8").read().splitlines() == [
+            f"INFO info {i}" for i in range(5)
+        ]
+
+    def test_warning_flushes_everything_written_so_far(self, file_handler):
+        file_handler.emit(make_record("before"))
+        file_handler.emit(make_record("problem", logging.WARNING))
+
+        assert open(file_handler.baseFilename, encoding="utf-8").read().splitlines() == [
+            "INFO before", "WARNING problem"
+        ]
+
+
+class TestBatchingQueueListener:
+    """Test that a burst of queued records is flushed once"""
+
+    def test_burst_is_flushed_once_when_queue_drains(self, file_handler):
+        log_queue = queue.Queue(-1)
+        for i in range(50):
+            log_queue.put(make_record(f"info {i}"))
+
+        flushed = threading.Event()
+        real_flush = file_handler.flush
+
+        def flush():
+            real_flush()
+            flushed.set()
+
+        with patch.object(file_handler, "flush", side_effect=flush) as mock_flush:
+            listener = BatchingQueueListener(log_queue, file_handler)
+            listener.start()
+            assert flushed.wait(timeout=5)
+            listener.stop()
+
+        # One flush when the burst is drained; nothing per record
+        assert mock_flush.call_count == 1
+        lines = open(file_handler.baseFilename, encoding="utf-8").read().splitlines()
+        assert lines == [f"INFO info {i}" for i in range(50)]
+
+
+class TestSetupLogger:
+    """Test the queued file logging end to end"""
+
+    @pytest.fixture(autouse=True)
+    def reset_logger(self):
+        yield
+        stop_file_listener()
+        logging.getLogger("cfst_extractor").handlers.clear()
+
+    def test_stop_file_listener_writes_all_records(self, tmp_path):
+        log_file = tmp_path / "logs" / "run.log"
+        log = setup_logger(str(log_file), console_level=logging.CRITICAL)
+
+        for i in range(20):
+            log.debug("debug %d", i)
+        stop_file_listener()
+
+        lines = log_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 20
+        assert lines[-1].endswith("debug 19")
+        assert logger_module._file_listener is None
+
+    def test_setup_logger_replaces_previous_listener(self, tmp_path):
+        first, second = tmp_path / "first.log", tmp_path / "second.log"
+        setup_logger(str(first), console_level=logging.CRITICAL).info("one")
+        setup_logger(str(second), console_level=logging.CRITICAL).info("two")
+        stop_file_listener()
+
+        assert first.read_text(encoding="utf-8").rstrip().endswith("one")
+        assert second.read_text(encoding="utf-8").rstrip().endswith("two")
@@ -0,0 +1,289 @@
+"""
+Unit tests for the per-file workflow in main.py
+
+Test coverage:
+- process_single_file routing (success, excluded, manual review, failed, prefilter)
+- process_files result ordering and file moves with concurrent_files > 1
+- filename-prefixed progress output when running concurrently
+"""
+
+import os
+import sys
+import time
+import pytest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import process_single_file, process_files, ensure_move_directories
+
+
+def _record(name):
+    return {"specimen_label": name}
+
+
+# Stubbed API results keyed by PDF name
+API_RESULTS = {
+    "a": {"is_valid": True, "Group_A": [_record("a1")], "Group_B": [], "Group_C": []},
+    "b": {"is_valid": True, "Group_A": [], "Group_B": [], "Group_C": []},
+    "c": {"is_valid": True, "Group_A": [_record("c1")], "Group_B": [_record("c2")], "Group_C": []},
+    "d": {"is_valid": False, "reason": "Not CFST"},
+    "e": None,
+}
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Point main's directories at tmp_path and stub the PDF/API/archive stages"""
+    dirs = {name: tmp_path / name for name in ("files", "NotInput", "Excluded", "Manual_Review")}
+    dirs["files"].mkdir()
+    config = {
+        "processing_settings": {"enable_text_prefilter": True, "concurrent_files": 3},
+        "paths": {"manual_review_path": str(dirs["Manual_Review"])},
+    }
+
+    def fake_process_pdf(file_path, client, config, system_prompt, mode="full"):
+        return {"cache_dir": str(tmp_path / "cache"), "image_paths": ["1.jpg"]}
+
+    def fake_process_from_cache(cache_dir, pdf_name, image_paths, client, config, system_prompt):
+        # Make the first file finish last so ordering is really exercised
+        if pdf_name == "a":
+            time.sleep(0.2)
+        return API_RESULTS[pdf_name]
+
+    with patch.object(main, "TARGET_DIRECTORY", str(dirs["files"])), \
+         patch.object(main, "NOT_INPUT_DIRECTORY", str(dirs["NotInput"])), \
+         patch.object(main, "EXCLUDED_DIRECTORY", str(dirs["Excluded"])), \
+         patch("main.is_clearly_non_cfst", return_value=False), \
+         patch("main.process_pdf", side_effect=fake_process_pdf), \
+         patch("main.process_from_cache", side_effect=fake_process_from_cache), \
+         patch("main.archive_cache", return_value=str(tmp_path / "archive")):
+        ensure_move_directories(config)
+        yield dirs, config
+
+
+def _add_pdfs(dirs, *names):
+    filenames = [f"{name}.pdf" for name in names]
+    for filename in filenames:
+        (dirs["files"] / filename).write_bytes(b"%PDF-1.4")
+    return filenames
+
+
+class TestProcessSingleFile:
+    """Test routing of a single PDF through the workflow stages"""
+
+    def test_success_injects_ref_no_and_keeps_pdf(self, workspace):
+        dirs, config = workspace
+        _add_pdfs(dirs, "c")
+
+        file_data = process_single_file("c.pdf", None, config, 1, "2025-01-01")
+
+        assert file_data["Group_A"] == [{"specimen_label": "c1", "ref_no": "c.pdf"}]
+        assert file_data["Group_B"] == [{"specimen_label": "c2", "ref_no": "c.pdf"}]
+        assert (dirs["files"] / "c.pdf").exists()
+        # The stubbed API result itself is left untouched
+        assert "ref_no" not in API_RESULTS["c"]["Group_A"][0]
+
+    @pytest.mark.parametrize("name, destination", [
+        ("b", "Manual_Review"),  # no data extracted
+        ("d", "Excluded"),       # model says not a CFST paper
+    ])
+    def test_unusable_results_move_pdf(self, workspace, name, destination):
+        dirs, config = workspace
+        _add_pdfs(dirs, name)
+
+        assert process_single_file(f"{name}.pdf", None, config, 1) is None
+        assert (dirs[destination] / f"{name}.pdf").exists()
+        assert not (dirs["files"] / f"{name}.pdf").exists()
+
+    def test_api_failure_keeps_pdf_for_retry(self, workspace):
+        dirs, config = workspace
+        _add_pdfs(dirs, "e")
+
+        assert process_single_file("e.pdf", None, config, 1) is None
+        assert (dirs["files"] / "e.pdf").exists()
+
+    def test_extraction_failure_moves_to_not_input(self, workspace):
+        dirs, config = workspace
+        _add_pdfs(dirs, "a")
+
+        with patch("main.process_pdf", return_value=None):
+            assert process_single_file("a.pdf", None, config, 1) is None
+        assert (dirs["NotInput"] / "a.pdf").exists()
+
+    def test_prefilter_reject_goes_to_manual_review_without_api(self, workspace):
+        dirs, config = workspace
+        _add_pdfs(dirs, "a")
+
+        with patch("main.is_clearly_non_cfst", return_value=True), \
+             patch("main.process_pdf") as mock_process_pdf:
+            assert process_single_file("a.pdf", None, config, 1) is None
+        mock_process_pdf.assert_not_called()
+        assert (dirs["Manual_Review"] / "a.pdf").exists()
+
+
+class TestProcessFiles:
+    """Test the concurrent loop over all PDFs"""
+
+    def test_results_collected_in_file_order(self, workspace):
+        dirs, config = workspace
+        pdf_files = _add_pdfs(dirs, "a", "b", "c", "d", "e")
+        all_data = {"Group_A": [], "Group_B": [], "Group_C": []}
+
+        succeeded = process_files(pdf_files, None, config, 1, "2025-01-01", all_data)
+
+        assert succeeded == 2
+        # "a" finishes last but still comes first
+        assert [r["specimen_label"] for r in all_data["Group_A"]] == ["a1", "c1"]
+        assert [r["ref_no"] for r in all_data["Group_A"]] == ["a.pdf", "c.pdf"]
+        assert [r["specimen_label"] for r in all_data["Group_B"]] == ["c2"]
+        assert all_data["Group_C"] == []
+
+        assert sorted(os.listdir(dirs["files"])) == ["a.pdf", "c.pdf", "e.pdf"]
+        assert os.listdir(dirs["Manual_Review"]) == ["b.pdf"]
+        assert os.listdir(dirs["Excluded"]) == ["d.pdf"]
+
+    def test_creates_move_directories(self, workspace):
+        dirs, config = workspace
+        for name in ("NotInput", "Excluded", "Manual_Review"):
+            dirs[name].rmdir()
+
+        process_files([], None, config, 1, "2025-01-01", {"Group_A": [], "Group_B": [], "Group_C": []})
+
+        assert all(dirs[name].is_dir() for name in ("NotInput", "Excluded", "Manual_Review"))
+
+    def test_concurrent_output_is_prefixed_with_filename(self, workspace, capsys):
+        dirs, config = workspace
+        pdf_files = _add_pdfs(dirs, "a", "c")
+        original_stdout = sys.stdout
+
+        process_files(pdf_files, None, config, 1, "2025-01-01", {"Group_A": [], "Group_B": [], "Group_C": []})
+
+        assert sys.stdout is original_stdout
+        lines = [line for line in capsys.readouterr().out.splitlines() if line.strip()]
+        assert lines
+        assert all(line.startswith(("[a.pdf] ", "[c.pdf] ")) for line in lines)
+        assert any(line.startswith("[a.pdf] ") and "阶段2完成" in line for line in lines)
+
+    def test_single_worker_output_is_unprefixed(self, workspace, capsys):
+        dirs, config = workspace
+        config["processing_settings"]["concurrent_files"] = 1
+        pdf_files = _add_pdfs(dirs, "a")
+
+        process_files(pdf_files, None, config, 1, "2025-01-01", {"Group_A": [], "Group_B": [], "Group_C": []})
+
+        out = capsys.readouterr().out
+        assert "--- Processing a.pdf ---" in out
+        assert "[a.pdf]" not in out
+
+
+class TestMoveFile:
+    """Test the move helpers without ensure_move_directories having run"""
+
+    def test_missing_destination_directory_is_created(self, tmp_path):
+        source = tmp_path / "a.pdf"
+        source.write_bytes(b"%PDF-1.4")
+        excluded = tmp_path / "not_yet" / "Excluded"
+
+        with patch.object(main, "EXCLUDED_DIRECTORY", str(excluded)):
+            main.move_excluded_file(str(source))
+
+        assert (excluded / "a.pdf").exists()
+        assert not source.exists()
+
+    def test_missing_source_is_reported_not_raised(self, tmp_path, capsys):
+        review = tmp_path / "Manual_Review"
+        config = {"paths": {"manual_review_path": str(review)}}
+
+        main.move_to_manual_review(str(tmp_path / "gone.pdf"), config)
+
+        assert "Error moving file gone.pdf" in capsys.readouterr().out
+        assert not review.exists()
+
+
+class TestWalkPdfFiles:
+    """Test the scandir-based directory walk against os.walk"""
+
+    @staticmethod
+    def _reference(top):
+        return [
+            (name, os.path.join(root, name))
+            for root, _, files in os.walk(top)
+            for name in files
+            if name.lower().endswith(".pdf")
+        ]
+
+    def test_matches_os_walk_with_nested_dirs_symlinks_and_case(self, tmp_path):
+        for rel in ("top.pdf", "notes.txt", "a/UPPER.PDF", "a/b/c/deep.Pdf",
+                    "a/b/skip.pdfx", "z/last.pdf", "outside/linked.pdf"):
+            path = tmp_path / "root" / rel if not rel.startswith("outside") else tmp_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"%PDF-1.4")
+        root = tmp_path / "root"
+        # Directory symlinks are not followed; file symlinks are listed like os.walk does
+        (root / "a" / "link_dir").symlink_to(tmp_path / "outside", target_is_directory=True)
+        (root / "z" / "link.pdf").symlink_to(tmp_path / "outside" / "linked.pdf")
+
+        result = list(main.walk_pdf_files(str(root)))
+
+        assert result == self._reference(str(root))
+        assert sorted(name for name, _ in result) == ["UPPER.PDF", "deep.Pdf", "last.pdf", "link.pdf", "top.pdf"]
+
+    def test_missing_top_yields_nothing(self, tmp_path):
+        assert list(main.walk_pdf_files(str(tmp_path / "missing"))) == []
+
+
+class TestImportPdfsFromWindows:
+    """Test duplicate-name handling when importing into files/"""
+
+    @pytest.fixture
+    def import_dirs(self, tmp_path):
+        source, target = tmp_path / "source", tmp_path / "files"
+        (source / "sub").mkdir(parents=True)
+        target.mkdir()
+        config = {"paths": {"windows_source_path": str(source)}, "delete_existing_before_import": False}
+        with patch.object(main, "TARGET_DIRECTORY", str(target)), patch("main.save_state"):
+            yield source, target, config
+
+    def test_detects_case_sensitive_directory(self, tmp_path):
+        probe_dir = tmp_path / "files"
+        probe_dir.mkdir()
+        (probe_dir / "existing.pdf").write_bytes(b"x")
+        if (tmp_path / "FILES").exists():
+            pytest.skip("temporary directory is on a case-insensitive filesystem")
+
+        with patch("main.tempfile.mkstemp", wraps=main.tempfile.mkstemp) as mock_mkstemp:
+            assert main.is_case_insensitive_dir(str(probe_dir)) is False
+
+        # The probe is made inside files/ itself (case sensitivity can be set per
+        # directory on WSL/Windows) and removed again
+        assert mock_mkstemp.call_args.kwargs["dir"] == str(probe_dir)
+        assert os.listdir(probe_dir) == ["existing.pdf"]
+        assert main.is_case_insensitive_dir(str(tmp_path / "missing")) is False
+
+    def test_case_only_clash_kept_on_case_sensitive_fs(self, import_dirs):
+        source, target, config = import_dirs
+        (target / "Paper.pdf").write_bytes(b"old")
+        (source / "paper.pdf").write_bytes(b"new")
+        (source / "sub" / "Paper.pdf").write_bytes(b"newer")
+
+        with patch("main.is_case_insensitive_dir", return_value=False):
+            assert main.import_pdfs_from_windows(config, state={}) is True
+
+        assert sorted(os.listdir(target)) == ["Paper.pdf", "Paper_1.pdf", "paper.pdf"]
+        assert (target / "Paper.pdf").read_bytes() == b"old"
+        assert (target / "paper.pdf").read_bytes() == b"new"
+        assert (target / "Paper_1.pdf").read_bytes() == b"newer"
+
+    def test_case_only_clash_renamed_on_case_insensitive_fs(self, import_dirs):
+        source, target, config = import_dirs
+        (target / "Paper.pdf").write_bytes(b"old")
+        (source / "paper.pdf").write_bytes(b"new")
+
+        with patch("main.is_case_insensitive_dir", return_value=True):
+            assert main.import_pdfs_from_windows(config, state={}) is True
+
+        assert sorted(os.listdir(target)) == ["Paper.pdf", "paper_1.pdf"]
+        assert (target / "Paper.pdf").read_bytes() == b"old"
@@ -4,6 +4,7 @@ Unit tests for PDF cache processing functionality
 Test coverage:
 - process_pdf with mode="extract_only" and mode="full"
 - process_from_cache normal and failure scenarios
+- get_page_count via pdfinfo and the pdfplumber fallback
 - archive_cache functionality
 """
 
@@ -12,6 +13,7 @@ import sys
 import pytest
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch, MagicMock
 from PIL import Image
 import numpy as np
@@ -19,8 +21,9 @@ import numpy as np
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processing import process_pdf, process_from_cache
-from main import archive_cache
+from processing import process_pdf, process_from_cache, is_clearly_non_cfst, save_ai_result, load_cached_ai_result, get_page_count
+from main import archive_cache, apply_cli_overrides
+import processing
 from config_manager import load_and_validate_config
 
 
@@ -64,10 +67,11 @@ class TestProcessPdfExtractOnly:
     def test_extract_only_returns_image_paths(self):
         """Test that extract_only mode returns correct image paths"""
         with tempfile.TemporaryDirectory() as tmpdir:
-            # Create mock PDF
+            # Create a 3-page PDF: the last (references) page is skipped, leaving
+            # pages 1-2 to match the 2 mocked page images
             pdf_path = os.path.join(tmpdir, "test.pdf")
-            img = Image.fromarray(np.zeros((100, 100, 3), dtype=np.uint8))
-            img.save(pdf_path, "PDF", resolution=100)
+            pages = [Image.fromarray(np.zeros((100, 100, 3), dtype=np.uint8)) for _ in range(3)]
+            pages[0].save(pdf_path, "PDF", resolution=100, save_all=True, append_images=pages[1:])
 
             config = {
                 "processing_settings": {
@@ -304,6 +308,21 @@ class TestProcessFromCache:
                 # Verify None returned on failure
                 assert result is None
 
+    def test_process_from_cache_logs_traceback_at_error(self, tmp_path, caplog):
+        """Test that an unexpected failure keeps its traceback on the ERROR record"""
+        img_path = str(tmp_path / "1.jpg")
+        Image.fromarray(np.zeros((100, 100, 3), dtype=np.uint8)).save(img_path, "JPEG")
+        config = {"api_settings": {"model_name": "test-model"}}
+
+        with patch('processing.call_vision_api', side_effect=RuntimeError("boom")), \
+             caplog.at_level("ERROR", logger="cfst_extractor"):
+            result = process_from_cache(str(tmp_path), "test", [img_path], Mock(), config, "test prompt")
+
+        assert result is None
+        records = [r for r in caplog.records if r.levelname == "ERROR"]
+        assert len(records) == 1
+        assert records[0].exc_info and records[0].exc_info[0] is RuntimeError
+
     def test_process_from_cache_reads_images(self):
         """Test that process_from_cache correctly reads images from cache"""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -344,6 +363,265 @@ class TestProcessFromCache:
                     assert len(args[0]) == 1
 
 
+class TestAiResultCache:
+    """Test caching of vision API results in process_from_cache"""
+
+    def _make_cache(self, tmpdir):
+        cache_dir = os.path.join(tmpdir, "test_cache")
+        os.makedirs(cache_dir)
+        img_path = os.path.join(cache_dir, "1.jpg")
+        img = Image.fromarray(np.zeros((100, 100, 3), dtype=np.uint8))
+        img.save(img_path, "JPEG")
+        return cache_dir, [img_path]
+
+    def test_cached_result_skips_api(self):
+        """Test that a second identical request is served from the AI cache"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir, image_paths = self._make_cache(tmpdir)
+            config = {
+                "api_settings": {"model_name": "test-model"},
+                "processing_settings": {"enable_ai_cache": True}
+            }
+
+            with patch('processing.AI_CACHE_DIR', os.path.join(tmpdir, "ai")):
+                with patch('processing.call_vision_api') as mock_api:
+                    mock_api.return_value = {"Group_A": [{"fc_value": 30.5}]}
+
+                    first = process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+                    second = process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+
+                    assert first == second
+                    mock_api.assert_called_once()
+
+    def test_prompt_change_misses_cache(self):
+        """Test that a different system prompt is not served from the cache"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir, image_paths = self._make_cache(tmpdir)
+            config = {
+                "api_settings": {"model_name": "test-model"},
+                "processing_settings": {"enable_ai_cache": True}
+            }
+
+            with patch('processing.AI_CACHE_DIR', os.path.join(tmpdir, "ai")):
+                with patch('processing.call_vision_api') as mock_api:
+                    mock_api.return_value = {"Group_A": [{"fc_value": 30.5}]}
+
+                    process_from_cache(cache_dir, "test", image_paths, Mock(), config, "prompt one")
+                    process_from_cache(cache_dir, "test", image_paths, Mock(), config, "prompt two")
+
+                    assert mock_api.call_count == 2
+
+    def test_base_url_change_misses_cache(self):
+        """Test that the same model name behind another endpoint is not served from the cache"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir, image_paths = self._make_cache(tmpdir)
+            config = {"api_settings": {"model_name": "test-model", "base_url": "https://one.example/v1"}}
+
+            with patch('processing.call_vision_api') as mock_api:
+                mock_api.return_value = {"Group_A": [{"fc_value": 30.5}]}
+
+                process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+                config["api_settings"]["base_url"] = "https://two.example/v1"
+                process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+
+                assert mock_api.call_count == 2
+
+    def test_user_message_change_misses_cache(self):
+        """Test that editing VISION_USER_MESSAGE is not served from the cache"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir, image_paths = self._make_cache(tmpdir)
+            config = {"api_settings": {"model_name": "test-model"}}
+
+            with patch('processing.call_vision_api') as mock_api:
+                mock_api.return_value = {"Group_A": [{"fc_value": 30.5}]}
+
+                process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+                with patch('processing.VISION_USER_MESSAGE', "另一条用户消息"):
+                    process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+
+                assert mock_api.call_count == 2
+                assert mock_api.call_args.kwargs["temperature"] == processing.VISION_TEMPERATURE
+
+    def test_failed_result_is_not_cached(self):
+        """Test that API failures are retried instead of cached"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir, image_paths = self._make_cache(tmpdir)
+            config = {"api_settings": {"model_name": "test-model"}}
+
+            with patch('processing.AI_CACHE_DIR', os.path.join(tmpdir, "ai")):
+                with patch('processing.call_vision_api') as mock_api:
+                    mock_api.return_value = None
+
+                    process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt", use_cache=True)
+                    process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt", use_cache=True)
+
+                    assert mock_api.call_count == 2
+
+    @pytest.mark.parametrize("result", [
+        {"is_valid": False, "reason": "not a CFST paper"},
+        {"is_valid": True, "Group_A": [], "Group_B": [], "Group_C": []},
+        {"Group_A": "n/a"},
+    ])
+    def test_rejected_or_empty_result_is_not_cached(self, result):
+        """Test that answers the pipeline rejects are asked again on retry"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir, image_paths = self._make_cache(tmpdir)
+            config = {"api_settings": {"model_name": "test-model"}}
+
+            with patch('processing.AI_CACHE_DIR', os.path.join(tmpdir, "ai")):
+                with patch('processing.call_vision_api') as mock_api:
+                    mock_api.return_value = result
+
+                    process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt", use_cache=True)
+                    process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt", use_cache=True)
+
+                    assert mock_api.call_count == 2
+
+    def test_concurrent_saves_leave_complete_entry(self):
+        """Test that parallel writers of one key never leave a partial or temp file"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ai_dir = os.path.join(tmpdir, "ai")
+            result = {"Group_A": [{"fc_value": float(i)} for i in range(2000)]}
+
+            with patch('processing.AI_CACHE_DIR', ai_dir):
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    list(executor.map(lambda _: save_ai_result("samekey", result), range(16)))
+
+                assert os.listdir(ai_dir) == ["samekey.json"]
+                assert load_cached_ai_result("samekey") == result
+
+    def test_cache_is_on_when_setting_missing(self):
+        """Test that the code-level default matches the config default (enabled)"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir, image_paths = self._make_cache(tmpdir)
+            config = {"api_settings": {"model_name": "test-model"}}
+
+            with patch('processing.call_vision_api') as mock_api:
+                mock_api.return_value = {"Group_A": [{"fc_value": 30.5}]}
+
+                process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+                process_from_cache(cache_dir, "test", image_paths, Mock(), config, "test prompt")
+
+                mock_api.assert_called_once()
+
+    def test_no_ai_cache_flag_disables_cache(self):
+        """Test that --no-ai-cache overrides enable_ai_cache for the run"""
+        config = {"processing_settings": {"enable_ai_cache": True}}
+
+        apply_cli_overrides(config, Mock(no_ai_cache=True))
+
+        assert config["processing_settings"]["enable_ai_cache"] is False
+
+
+class TestTextPrefilter:
+    """Test the local CFST keyword prefilter"""
+
+    @staticmethod
+    def pages_of(pages):
+        """Patch iter_page_texts to yield the given {page: text} mapping"""
+        return patch('processing.iter_page_texts', side_effect=lambda path: iter(pages.items()))
+
+    def test_text_without_keywords_is_excluded(self):
+        """Test that a long text layer with no CFST keywords is excluded"""
+        pages = {1: "Reinforced masonry walls under cyclic loading. " * 50}
+        with self.pages_of(pages):
+            assert is_clearly_non_cfst("paper.pdf") is True
+
+    def test_text_with_keywords_is_kept(self):
+        """Test that a CFST keyword anywhere keeps the file"""
+        pages = {1: "Introduction. " * 200, 2: "Concrete-filled steel tubular columns"}
+        with self.pages_of(pages):
+            assert is_clearly_non_cfst("paper.pdf") is False
+
+    @pytest.mark.parametrize("keyword", [
+        "concrete-filled",
+        "Concrete\nfilled",
+        "concrete \n filled",
+        "concrete\u2010filled",
+        "concrete\u2011filled",
+        "concrete\u2013filled",
+        "CFTs",
+        "cft",
+    ])
+    def test_keyword_variants_are_kept(self, keyword):
+        """Test wrapped lines, Unicode hyphens and plurals still count as CFST"""
+        pages = {1: "Introduction. " * 200 + f"Tests on {keyword} steel tubes."}
+        with self.pages_of(pages):
+            assert is_clearly_non_cfst("paper.pdf") is False
+
+    def test_keyword_split_across_pages_is_kept(self):
+        """Test that a keyword broken by a page boundary is still found"""
+        pages = {1: "Introduction. " * 200 + "axially loaded concrete", 2: "filled steel tubes"}
+        with self.pages_of(pages):
+            assert is_clearly_non_cfst("paper.pdf") is False
+
+    def test_similar_words_do_not_match(self):
+        """Test that words merely containing CFT are not treated as keywords"""
+        pages = {1: "Aircraft loads and CFTR protein studies. " * 60}
+        with self.pages_of(pages):
+            assert is_clearly_non_cfst("paper.pdf") is True
+
+    def test_stops_parsing_after_first_keyword(self):
+        """Test that pages after the first keyword hit are never extracted"""
+        parsed = []
+
+        def fake_pages(path):
+            for page_num in range(1, 11):
+                parsed.append(page_num)
+                yield page_num, "CFST columns" if page_num == 2 else "text " * 100
+
+        with patch('processing.iter_page_texts', side_effect=fake_pages):
+            assert is_clearly_non_cfst("paper.pdf") is False
+        assert parsed == [1, 2]
+
+    def test_scanned_or_unreadable_pdf_is_kept(self):
+        """Test that short text layers and extraction errors never exclude"""
+        with self.pages_of({1: "", 2: "p. 2"}):
+            assert is_clearly_non_cfst("paper.pdf") is False
+
+        with patch('processing.iter_page_texts', side_effect=Exception("broken")):
+            assert is_clearly_non_cfst("paper.pdf") is False
+
+
+class TestGetPageCount:
+    """Test get_page_count with pdfinfo and the pdfplumber fallback"""
+
+    @staticmethod
+    def make_pdf(path, pages):
+        images = [Image.fromarray(np.zeros((50, 50, 3), dtype=np.uint8)) for _ in range(pages)]
+        images[0].save(path, "PDF", resolution=100, save_all=True, append_images=images[1:])
+
+    def test_uses_pdfinfo_page_count(self, tmp_path):
+        pdf_path = str(tmp_path / "test.pdf")
+        self.make_pdf(pdf_path, 1)
+
+        with patch('processing.pdfinfo_from_path', return_value={"Pages": "7"}) as mock_info, \
+             patch('processing.pdfplumber.open') as mock_open:
+            assert get_page_count(pdf_path) == 7
+        mock_info.assert_called_once_with(pdf_path)
+        mock_open.assert_not_called()
+
+    def test_falls_back_to_pdfplumber(self, tmp_path, capsys):
+        pdf_path = str(tmp_path / "test.pdf")
+        self.make_pdf(pdf_path, 3)
+
+        with patch('processing.pdfinfo_from_path', side_effect=RuntimeError("pdfinfo not installed")):
+            assert get_page_count(pdf_path) == 3
+        assert "pdfinfo not installed" in capsys.readouterr().out
+
+    def test_unreadable_pdf_raises(self, tmp_path):
+        pdf_path = tmp_path / "broken.pdf"
+        pdf_path.write_bytes(b"not a pdf")
+
+        with patch('processing.pdfinfo_from_path', side_effect=RuntimeError("pdfinfo failed")):
+            with pytest.raises(Exception, match="无法读取PDF页数"):
+                get_page_count(str(pdf_path))
+
+    def test_missing_file_raises_file_not_found(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            get_page_count(str(tmp_path / "missing.pdf"))
+
+
 class TestArchiveCache:
     """Test archive_cache function"""
 
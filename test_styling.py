@@ -0,0 +1,151 @@
+"""
+Unit tests for Excel styling helpers
+
+Test coverage:
+- manual_check_mask handles bool/numeric/string/mixed columns
+- apply_excel_styling highlights flagged rows and centers columns
+- column widths with all-None/NaN columns
+- reorder_columns_for_export ordering and default values
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from styling import apply_excel_styling, export_to_excel_with_styling, manual_check_mask, reorder_columns_for_export
+from validation import validate_records
+from main import COL_MAPPING
+
+
+class TestManualCheckMask:
+    """Test vectorized 'Needs Manual Check' coercion"""
+
+    def test_bool_column(self):
+        """Boolean columns are used as-is"""
+        mask = manual_check_mask(pd.Series([True, False, True]))
+
+        assert mask.tolist() == [True, False, True]
+
+    def test_numeric_column(self):
+        """Non-zero numbers are flagged, zero and NaN are not"""
+        mask = manual_check_mask(pd.Series([1, 0, 2.5, np.nan]))
+
+        assert mask.tolist() == [True, False, True, False]
+
+    def test_mixed_object_column(self):
+        """Strings are matched case-insensitively alongside bools and numbers"""
+        values = pd.Series([True, 'Yes', 'no', '1', 'TRUE', 0, 3, None, ''], dtype=object)
+
+        mask = manual_check_mask(values)
+
+        assert mask.tolist() == [True, True, False, True, True, False, True, False, False]
+
+
+class TestApplyExcelStyling:
+    """Test direct openpyxl formatting of exported sheets"""
+
+    def test_highlight_and_alignment(self, tmp_path):
+        """Flagged rows are filled, all columns but Ref.No. are centered"""
+        df = pd.DataFrame({
+            'Ref.No.': ['a.pdf', 'b.pdf'],
+            'fc (MPa)': [40, 50],
+            'Needs Manual Check': [True, False],
+        })
+        output_file = str(tmp_path / "styled.xlsx")
+
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            apply_excel_styling(df, writer, 'Group_A')
+
+        worksheet = load_workbook(output_file)['Group_A']
+        flagged, clean = worksheet[2], worksheet[3]
+
+        assert all(cell.fill.fgColor.rgb.endswith('FFCCCC') for cell in flagged)
+        assert all(cell.fill.fill_type is None for cell in clean)
+        assert flagged[0].alignment.horizontal is None
+        assert flagged[1].alignment.horizontal == 'center'
+        assert worksheet.freeze_panes == 'A2'
+
+    def test_column_widths(self, tmp_path):
+        """Widths fit the longest header or value, capped at 50"""
+        df = pd.DataFrame({
+            'Ref.No.': ['a.pdf', 'a_much_longer_file_name.pdf'],
+            'Source Evidence': ['x' * 80, 'y'],
+        })
+        output_file = str(tmp_path / "widths.xlsx")
+
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            apply_excel_styling(df, writer, 'Group_A')
+
+        worksheet = load_workbook(output_file)['Group_A']
+
+        assert worksheet.column_dimensions['A'].width == len('a_much_longer_file_name.pdf') + 2
+        assert worksheet.column_dimensions['B'].width == 50
+
+
+    def test_column_widths_with_empty_values(self, tmp_path):
+        """All-None/NaN columns still get header-based widths"""
+        df = pd.DataFrame({
+            'Ref.No.': ['a.pdf'],
+            'fcy150 (MPa)': [None],
+            'fc (MPa)': [np.nan],
+        })
+        output_file = str(tmp_path / "empty.xlsx")
+
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            apply_excel_styling(df, writer, 'Group_A')
+
+        worksheet = load_workbook(output_file)['Group_A']
+
+        assert worksheet.column_dimensions['B'].width == len('fcy150 (MPa)') + 2
+        assert worksheet.column_dimensions['C'].width == len('fc (MPa)') + 2
+
+    def test_export_with_all_none_column(self, tmp_path):
+        """A record with a None field still produces an Excel file"""
+        output_file = str(tmp_path / "export.xlsx")
+        record = {
+            "ref_no": "a.pdf", "specimen_label": "S1", "fc_value": 40, "fc_type": "cube",
+            "fy": 300, "fcy150": None, "r_ratio": 0, "b": 200, "h": 200, "t": 5,
+            "r0": 0, "L": 600, "e1": 0, "e2": 0, "n_exp": 1000,
+        }
+        data = {
+            "Group_A": pd.DataFrame(validate_records([record])),
+            "Group_B": pd.DataFrame(),
+            "Group_C": pd.DataFrame(),
+        }
+
+        assert export_to_excel_with_styling(data, output_file, COL_MAPPING) is True
+        assert os.path.exists(output_file)
+
+
+class TestReorderColumnsForExport:
+    """Test export column ordering"""
+
+    COL_MAPPING = {'ref_no': 'Ref.No.', 'fc_value': 'fc (MPa)', 'n_exp': 'N_exp (kN)'}
+
+    def test_order_and_defaults(self):
+        """source_evidence follows n_exp; missing columns get defaults"""
+        df = pd.DataFrame({'n_exp': [3000], 'ref_no': ['a.pdf'], 'extra': [1]})
+
+        result = reorder_columns_for_export(df, self.COL_MAPPING)
+
+        assert list(result.columns) == [
+            'Ref.No.', 'fc (MPa)', 'N_exp (kN)', 'Source Evidence',
+            'N_theory (kN)', 'ξ (Validation Coefficient)', 'Needs Manual Check',
+        ]
+        assert result.iloc[0]['fc (MPa)'] == ""
+        assert result.iloc[0]['N_theory (kN)'] == 0.0
+        assert result.iloc[0]['Needs Manual Check'] == ""
+
+    def test_input_not_modified(self):
+        """The caller's DataFrame keeps its original columns"""
+        df = pd.DataFrame({'n_exp': [3000]})
+
+        reorder_columns_for_export(df, self.COL_MAPPING)
+
+        assert list(df.columns) == ['n_exp']
@@ -0,0 +1,84 @@
+"""
+Unit tests for physical validation
+
+Test coverage:
+- validate_records matches validate_dataframe on the same specimens
+- missing values in records are treated as NaN
+- count_xi_zones agrees with the manual check thresholds
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validation import validate_dataframe, validate_records, count_xi_zones
+
+
+SPECIMENS = [
+    {"fc_value": 40, "fy": 350, "b": 200, "h": 200, "t": 5, "r0": 0, "n_exp": 3000},
+    {"fc_value": 40.5, "fy": 350, "b": 300, "h": 150, "t": 4, "r0": 75, "n_exp": 5000},
+    {"fc_value": 30, "fy": 300, "b": 100, "h": 120, "t": 3, "r0": 0, "n_exp": 900},
+]
+
+
+class TestValidateRecords:
+    """Test list-based validation"""
+
+    def test_matches_validate_dataframe(self):
+        """Records path produces the same columns and values as the DataFrame path"""
+        expected = validate_dataframe(pd.DataFrame(SPECIMENS))
+        result = pd.DataFrame(validate_records(SPECIMENS))
+
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_does_not_mutate_input(self):
+        """Input records are left untouched"""
+        records = [dict(item) for item in SPECIMENS]
+        validate_records(records)
+
+        assert records == SPECIMENS
+
+    def test_missing_values_flag_manual_check(self):
+        """None or absent fields become NaN and require manual review"""
+        records = [
+            {**SPECIMENS[0], "fc_value": None},
+            {k: v for k, v in SPECIMENS[1].items() if k != "n_exp"},
+        ]
+
+        result = validate_records(records)
+
+        assert np.isnan(result[0]["N_theory"])
+        assert np.isnan(result[1]["xi"])
+        assert all(row["needs_manual_check"] for row in result)
+
+    def test_fill_adds_missing_columns(self):
+        """fill defaults are added to every record, after its own keys"""
+        records = [{k: v for k, v in SPECIMENS[0].items() if k != "r0"}]
+
+        result = validate_records(records, fill={"r0": 0.0, "fcy150": ""})
+
+        assert result[0]["r0"] == 0.0
+        assert result[0]["fcy150"] == ""
+        assert list(result[0])[-5:] == ["r0", "fcy150", "N_theory", "xi", "needs_manual_check"]
+        assert "r0" not in records[0]
+
+
+class TestCountXiZones:
+    """Test zone counting shared by the summary and the text report"""
+
+    def test_matches_manual_check_rules(self):
+        """Boundaries follow determine_manual_check_status; NaN is yellow"""
+        xi = [0.8, 1.0, 2.5, 5.0, 10.5, 0.05, np.nan]
+
+        assert count_xi_zones(xi) == (1, 4, 2)
+
+    def test_accepts_series(self):
+        """A DataFrame column gives the same counts as a list"""
+        df = validate_dataframe(pd.DataFrame(SPECIMENS))
+
+        assert count_xi_zones(df['xi']) == count_xi_zones(df['xi'].tolist())
+        assert sum(count_xi_zones(df['xi'])) == len(df)
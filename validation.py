@@ -5,7 +5,7 @@ Based on requirements spec: 06-requirements-spec.md
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 
 def calculate_inner_radius(r0: float, h: float, t: float) -> float:
@@ -168,6 +168,25 @@ def determine_manual_check_status(xi: float) -> bool:
         return True   # Yellow zone, manual review required
 
 
+def count_xi_zones(xi) -> Tuple[int, int, int]:
+    """
+    Count specimens per validation zone in one vectorized pass.
+
+    Uses the same thresholds as determine_manual_check_status. Non-numeric
+    or missing ξ values fall into the yellow zone.
+
+    Args:
+        xi: Sequence or Series of validation coefficients
+
+    Returns:
+        (green, yellow, red) counts
+    """
+    values = pd.to_numeric(pd.Series(xi), errors='coerce').to_numpy(dtype=np.float64)
+    green = int(np.count_nonzero((values > 0.8) & (values < 2.5)))
+    red = int(np.count_nonzero((values > 10) | (values < 0.1)))
+    return green, len(values) - green - red, red
+
+
 def validate_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     Apply physical validation to a DataFrame of specimen data.
@@ -206,6 +225,55 @@ def validate_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     return result_df
 
 
+def _as_number(value: Any) -> Any:
+    """Treat missing values (None) as NaN, matching pandas column coercion."""
+    return np.nan if value is None else value
+
+
+def validate_records(records: List[Dict[str, Any]],
+                     fill: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Apply physical validation to a list of specimen records.
+
+    Same results as validate_dataframe(), but works on plain dicts so the
+    per-specimen formulas run without building a DataFrame and dispatching
+    a row-wise apply for each derived column. Keys missing from a record
+    are treated as NaN, as pandas does for ragged records.
+
+    Adds keys:
+    - N_theory: Theoretical capacity (kN)
+    - xi: Validation coefficient
+    - needs_manual_check: Boolean flag for manual review
+
+    Args:
+        records: Specimen dicts with keys: fc_value, fy, b, h, t, r0, n_exp
+        fill: Optional {column: default} added to every record before
+            validation (columns none of the records provide)
+
+    Returns:
+        New list of dicts with the fill columns and validation keys added
+    """
+    validated = []
+    for record in records:
+        if fill:
+            record = {**record, **fill}
+        get = record.get
+        n_theory = calculate_theoretical_capacity(
+            _as_number(get('fc_value')), _as_number(get('fy')),
+            _as_number(get('b')), _as_number(get('h')),
+            _as_number(get('t')), _as_number(get('r0'))
+        )
+        xi = calculate_validation_coefficient(_as_number(get('n_exp')), n_theory)
+        validated.append({
+            **record,
+            'N_theory': n_theory,
+            'xi': xi,
+            'needs_manual_check': determine_manual_check_status(xi)
+        })
+
+    return validated
+
+
 def get_validation_summary(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Generate summary statistics for validation results.
@@ -232,9 +300,7 @@ def get_validation_summary(df: pd.DataFrame) -> Dict[str, Any]:
     needs_check = df['needs_manual_check'].sum()
 
     # Count specimens in each zone
-    green_zone = ((df['xi'] > 0.8) & (df['xi'] < 2.5)).sum()
-    red_zone = ((df['xi'] > 10) | (df['xi'] < 0.1)).sum()
-    yellow_zone = total - green_zone - red_zone
+    green_zone, yellow_zone, red_zone = count_xi_zones(df['xi'])
 
     # Calculate statistics
     avg_xi = df['xi'].mean()